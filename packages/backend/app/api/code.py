@@ -3,17 +3,55 @@ from pydantic import BaseModel
 from typing import Optional, Any, Dict, List
 from pathlib import Path
 from ..core.execute_code import execute_python_code
+from ..core.worker_pool import worker_pool
+from .responses import ORJSONResponse
 from ..core import node_operations
 from ..core.enhanced_flow_executor import EnhancedFlowExecutor
+import asyncio
+import json
+import orjson
 import os
 
 router = APIRouter()
 
-# Projects root path
-PROJECTS_ROOT = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "projects")
+# Backend root and projects root paths, resolved once at import
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+PROJECTS_ROOT = BASE_DIR / "projects"
+
+# Upper bound on code executions running at once across all requests
+_EXECUTION_SEM = asyncio.Semaphore(int(os.getenv("MAX_CONCURRENT_EXECUTIONS", "32")))
 
 # Global executor instance for metadata analysis
-metadata_executor = EnhancedFlowExecutor(Path(PROJECTS_ROOT))
+metadata_executor = EnhancedFlowExecutor(PROJECTS_ROOT)
+
+# Script run by /execute-node: the node code followed by a call to main() or
+# RunScript() with the JSON input read from stdin
+_WRAPPER_TEMPLATE = """
+import json
+import sys
+
+# Node code
+%(code)s
+
+# Execute with input
+try:
+    input_data = json.loads(sys.stdin.read() or 'null')
+    
+    # Find and execute the entry function
+    entry = globals().get('main') or globals().get('RunScript')
+    if not callable(entry):
+        raise RuntimeError("Node must define a 'main(input_data=None)' or 'RunScript' function")
+    result = entry(input_data) if input_data is not None else entry()
+    
+    print(json.dumps({'success': True, 'output': result}))
+except Exception as e:
+    import traceback
+    print(json.dumps({
+        'success': False,
+        'error': str(e),
+        'traceback': traceback.format_exc()
+    }))
+"""
 
 class CodeExecutionRequest(BaseModel):
     code: str
@@ -65,14 +103,15 @@ async def execute_code(request: CodeExecutionRequest):
     if request.language != "python":
         raise HTTPException(status_code=400, detail="Only Python is supported")
     
-    result = execute_python_code(request.code, request.timeout)
+    async with _EXECUTION_SEM:
+        result = await asyncio.to_thread(execute_python_code, request.code, request.timeout)
     return CodeExecutionResponse(**result)
 
 @router.post("/getcode")
 async def get_node_code(request: GetNodeCodeRequest):
     """Get the code content of a node for Monaco Editor"""
     try:
-        code = node_operations.get_node_code(request.project_id, request.node_id)
+        code = await asyncio.to_thread(node_operations.get_node_code, request.project_id, request.node_id)
         
         # Return in format compatible with Monaco Editor
         return {
@@ -112,7 +151,8 @@ async def get_node_code(request: GetNodeCodeRequest):
 async def save_node_code(request: SaveNodeCodeRequest):
     """Save code to a node's python file"""
     try:
-        result = node_operations.save_node_code(
+        result = await asyncio.to_thread(
+            node_operations.save_node_code,
             request.project_id,
             request.node_id,
             request.code
@@ -128,55 +168,22 @@ async def execute_single_node(request: ExecuteNodeRequest):
     """Execute a single node and return its output"""
     try:
         # Get the node's code
-        code = node_operations.get_node_code(request.project_id, request.node_id)
+        code = await asyncio.to_thread(node_operations.get_node_code, request.project_id, request.node_id)
         
-        # Create wrapper to execute the node with input data
-        import json
-        input_json_str = json.dumps(request.input_data) if request.input_data else 'null'
+        # Create wrapper to execute the node; input data goes through stdin
+        input_json_str = orjson.dumps(request.input_data).decode() if request.input_data else 'null'
         
-        wrapper_code = f"""
-import json
-import sys
-
-# Node code
-{code}
-
-# Execute with input
-try:
-    input_json = '''{input_json_str}'''
-    if input_json != 'null':
-        input_data = json.loads(input_json)
-    else:
-        input_data = None
-    
-    # Find and execute main function
-    if 'main' in locals() and callable(main):
-        result = main(input_data) if input_data is not None else main()
-    else:
-        # Find first callable
-        result = None
-        for name, obj in list(locals().items()):
-            if callable(obj) and not name.startswith('_') and name not in ['json', 'sys']:
-                result = obj(input_data) if input_data is not None else obj()
-                break
-    
-    print(json.dumps({{'success': True, 'output': result}}))
-except Exception as e:
-    import traceback
-    print(json.dumps({{
-        'success': False,
-        'error': str(e),
-        'traceback': traceback.format_exc()
-    }}))
-"""
+        wrapper_code = _WRAPPER_TEMPLATE % {"code": code}
         
-        # Execute the code using system Python
-        project_dir = os.path.join(PROJECTS_ROOT, request.project_id)
-        execution_result = execute_python_code(wrapper_code, timeout=30, python_executable=None, working_dir=project_dir)
+        # Execute the code in a warm worker for the project
+        project_dir = PROJECTS_ROOT / request.project_id
+        async with _EXECUTION_SEM:
+            execution_result = await worker_pool.execute(
+                request.project_id, wrapper_code, timeout=30, working_dir=str(project_dir), stdin=input_json_str
+            )
         
         if execution_result['exit_code'] == 0:
             try:
-                import json
                 output = json.loads(execution_result['output'])
                 if output.get('success'):
                     return {
@@ -244,7 +251,10 @@ async def get_packages(request: GetPackagesRequest):
 @router.post("/packages/info")
 async def get_package_info(project_id: str, package: str):
     """Get detailed information about a specific package (not available)"""
-    raise HTTPException(status_code=404, detail="Package management is not available in single Python environment mode")
+    return ORJSONResponse(
+        {"success": False, "error": f"Package {package} not found"},
+        status_code=404
+    )
 
 @router.post("/node/metadata")
 async def get_node_metadata(request: GetNodeMetadataRequest):
@@ -254,7 +264,8 @@ async def get_node_metadata(request: GetNodeMetadataRequest):
     """
     try:
         # Use the enhanced flow executor to analyze the node
-        metadata = metadata_executor.analyze_node_signature(
+        metadata = await asyncio.to_thread(
+            metadata_executor.analyze_node_signature,
             request.project_id,
             request.node_id,
             request.node_data or {"data": {}}
@@ -1,15 +1,24 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from pathlib import Path
-import json
+from ..core.project_operations import PROJECT_ID_RE
+from ..core.project_structure import get_project_structure_for_update, save_project_structure, structure_lock
+from ..core.structure_normalize import normalize_node
+import aiofiles
+import asyncio
+import re
 import shutil
 
 router = APIRouter()
 
-# Templates directory
-TEMPLATES_DIR = Path(__file__).parent.parent.parent / "templates"
-PROJECTS_ROOT = Path(__file__).parent.parent.parent / "projects"
+# Backend root, templates and projects directories, resolved once at import
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+TEMPLATES_DIR = BASE_DIR / "templates"
+PROJECTS_ROOT = BASE_DIR / "projects"
+
+# Characters replaced by "_" when deriving a node file name from its title
+_SANITIZE_RE = re.compile(r"\W")
 
 class ComponentTemplate(BaseModel):
     id: str
@@ -30,35 +39,75 @@ class ComponentLibraryResponse(BaseModel):
     success: bool
     templates: List[Dict[str, Any]]
 
+# Parsed template list, rebuilt only when a template file is added, removed or edited
+_TEMPLATE_CACHE: Optional[List[Dict[str, str]]] = None
+_TEMPLATE_CACHE_KEY: Tuple[Tuple[str, int, int], ...] = ()
+
+def _parse_template_description(template_file: Path) -> str:
+    """Get the first docstring line of a template as its description"""
+    description = ""
+    for line in template_file.read_text().splitlines()[:10]:
+        if line.strip().startswith('"""'):
+            continue
+        if '"""' in line:
+            break
+        if line.strip():
+            description = line.strip()
+            break
+    return description
+
+def _load_templates() -> List[Dict[str, str]]:
+    """Get template entries, re-parsing them only if a template file changed"""
+    global _TEMPLATE_CACHE, _TEMPLATE_CACHE_KEY
+    
+    if not TEMPLATES_DIR.exists():
+        return []
+    
+    # In-place edits keep the directory mtime, so key on every file's own stat
+    template_files = sorted(TEMPLATES_DIR.glob("*.py"))
+    key = []
+    for template_file in template_files:
+        stat = template_file.stat()
+        key.append((template_file.name, stat.st_mtime_ns, stat.st_size))
+    key = tuple(key)
+    if _TEMPLATE_CACHE is not None and key == _TEMPLATE_CACHE_KEY:
+        return _TEMPLATE_CACHE
+    
+    templates = []
+    for template_file in template_files:
+        templates.append({
+            "name": template_file.stem,
+            "description": _parse_template_description(template_file),
+            "file": template_file.name
+        })
+    
+    _TEMPLATE_CACHE = templates
+    _TEMPLATE_CACHE_KEY = key
+    return templates
+
+def _upsert_node(project_id: str, new_node: Dict[str, Any]) -> None:
+    """Add a node to the project structure, replacing any node with the same id"""
+    normalize_node(new_node)
+    with structure_lock(project_id):
+        try:
+            structure = get_project_structure_for_update(project_id)
+        except ValueError:
+            structure = {"nodes": [], "edges": []}
+        
+        for i, node in enumerate(structure["nodes"]):
+            if node["id"] == new_node["id"]:
+                structure["nodes"][i] = new_node
+                break
+        else:
+            structure["nodes"].append(new_node)
+        
+        save_project_structure(project_id, structure)
+
 @router.get("/library")
 async def get_component_library():
     """Get list of available component templates"""
     try:
-        templates = []
-        
-        # List all template files
-        if TEMPLATES_DIR.exists():
-            for template_file in TEMPLATES_DIR.glob("*.py"):
-                template_name = template_file.stem
-                
-                # Read first few lines to get description
-                with open(template_file, 'r') as f:
-                    lines = f.readlines()
-                    description = ""
-                    for line in lines[:10]:
-                        if line.strip().startswith('"""'):
-                            continue
-                        if '"""' in line:
-                            break
-                        if line.strip():
-                            description = line.strip()
-                            break
-                
-                templates.append({
-                    "name": template_name,
-                    "description": description,
-                    "file": template_file.name
-                })
+        templates = _load_templates()
         
         return {
             "success": True,
@@ -74,7 +123,7 @@ async def create_node_from_template(request: CreateFromTemplateRequest):
     try:
         # Get project directory
         project_dir = PROJECTS_ROOT / request.project_id
-        if not project_dir.exists():
+        if not PROJECT_ID_RE.match(request.project_id) or not project_dir.exists():
             raise HTTPException(status_code=404, detail="Project not found")
         
         # Get template file
@@ -83,21 +132,13 @@ async def create_node_from_template(request: CreateFromTemplateRequest):
             raise HTTPException(status_code=404, detail=f"Template '{request.template_name}' not found")
         
         # Create node file name
-        sanitized_title = "".join(c if c.isalnum() or c == "_" else "_" for c in request.title)
+        sanitized_title = _SANITIZE_RE.sub("_", request.title)
         node_file_name = f"{request.node_id}_{sanitized_title}.py"
         node_file_path = project_dir / node_file_name
         
         # Copy template to node file
-        shutil.copy(template_file, node_file_path)
-        
-        # Update structure.json to add the node
-        structure_file = project_dir / "structure.json"
-        if structure_file.exists():
-            with open(structure_file, 'r') as f:
-                structure = json.load(f)
-        else:
-            structure = {"nodes": [], "edges": []}
-        
+        await asyncio.to_thread(shutil.copy, template_file, node_file_path)
+
         # Determine node type based on template
         node_type = "custom"
         if "start" in request.template_name.lower():
@@ -117,21 +158,9 @@ async def create_node_from_template(request: CreateFromTemplateRequest):
             }
         }
         
-        # Check if node already exists
-        node_exists = False
-        for i, node in enumerate(structure["nodes"]):
-            if node["id"] == request.node_id:
-                structure["nodes"][i] = new_node
-                node_exists = True
-                break
-        
-        if not node_exists:
-            structure["nodes"].append(new_node)
-        
-        # Save updated structure
-        with open(structure_file, 'w') as f:
-            json.dump(structure, f, indent=2)
-        
+        # Update structure.json to add (or replace) the node
+        await asyncio.to_thread(_upsert_node, request.project_id, new_node)
+
         return {
             "success": True,
             "node_id": request.node_id,
@@ -150,8 +179,8 @@ async def get_template_code(template_name: str):
         if not template_file.exists():
             raise HTTPException(status_code=404, detail=f"Template '{template_name}' not found")
         
-        with open(template_file, 'r') as f:
-            code = f.read()
+        async with aiofiles.open(template_file, 'r') as f:
+            code = await f.read()
         
         return {
             "success": True,
@@ -1,67 +1,174 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.exceptions import RequestValidationError
 from fastapi.responses import StreamingResponse
-from pydantic import BaseModel, Field
-from typing import Optional, List, Dict, Any, Literal
-import json
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
+from typing import Optional, List, Dict, Any, Literal, Tuple, Union, Annotated
+from collections import OrderedDict
 import asyncio
+import orjson
+import threading
+import zlib
 from pathlib import Path
 from ..core import (
     project_operations,
     project_structure,
     node_operations,
-    edge_operations
+    edge_operations,
+    batch_operations
 )
-from ..core.flow_executor import FlowExecutor
 from ..core.enhanced_flow_executor import EnhancedFlowExecutor
 from ..core.flow_analyzer import FlowAnalyzer
+from ..core.worker_pool import worker_pool
+from .responses import ORJSONResponse, dumps_json
 
 router = APIRouter()
 
-# Global executor instance to maintain object store across requests
-_global_executor = None
+# SSE framing around each JSON-encoded event
+SSE_PREFIX = b"data: "
+SSE_SUFFIX = b"\n\n"
 
-# Constants
-PROJECTS_DIR = "projects"
+# Streamed events buffered between the flow executor and the SSE writer
+SSE_QUEUE_SIZE = 64
+# Most node results packed into a single "batch" SSE event
+SSE_MAX_BATCH = 16
+_STREAM_END = object()
+# gzip compression level for streamed events
+SSE_GZIP_LEVEL = 6
 
-def get_executor():
-    """Get or create the global executor instance"""
-    global _global_executor
-    if _global_executor is None:
-        import os
-        projects_root = os.path.join(
-            os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
-            "projects"
-        )
-        _global_executor = EnhancedFlowExecutor(projects_root)
-    return _global_executor
+def _encode_sse_event(event: Dict[str, Any]) -> bytes:
+    """Frame one event, sending an error event in its place if it cannot be encoded"""
+    try:
+        return SSE_PREFIX + dumps_json(event) + SSE_SUFFIX
+    except Exception as e:
+        error_event = orjson.dumps({
+            "type": "error",
+            "error": f"Could not encode {event.get('type', 'event')} event: {e}",
+            "node_id": event.get("node_id")
+        })
+        return SSE_PREFIX + error_event + SSE_SUFFIX
+
+def _encode_sse_events(events: List[Dict[str, Any]]) -> bytes:
+    """Frame node results as one SSE event, wrapping several in a batch event"""
+    if len(events) == 1:
+        return _encode_sse_event(events[0])
+    try:
+        return SSE_PREFIX + dumps_json({"type": "batch", "events": events}) + SSE_SUFFIX
+    except Exception:
+        # Frame the events one by one so only the failing one becomes an error
+        return b"".join(_encode_sse_event(event) for event in events)
+
+async def _forward_events(events, queue: asyncio.Queue) -> None:
+    """Copy events from an async iterator into a queue, ending with _STREAM_END or the error"""
+    try:
+        async for event in events:
+            await queue.put(event)
+        await queue.put(_STREAM_END)
+    except Exception as e:
+        await queue.put(e)
+
+async def _gzip_stream(chunks):
+    """Gzip an SSE byte stream, sync-flushing after each event so it reaches the client at once"""
+    compressor = zlib.compressobj(SSE_GZIP_LEVEL, zlib.DEFLATED, 31)
+    async for chunk in chunks:
+        yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
+
+def _accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    """Whether an Accept-Encoding header value allows gzip (q=0 refuses a coding)"""
+    qualities = {}
+    for entry in (accept_encoding or "").split(","):
+        coding, *params = [part.strip() for part in entry.split(";")]
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding:
+            qualities[coding.lower()] = quality
+    return qualities.get("gzip", qualities.get("x-gzip", qualities.get("*", 0.0))) > 0
+
+# Projects root path, resolved once at import
+PROJECTS_ROOT = Path(__file__).resolve().parent.parent.parent / "projects"
+
+# Flow analyses of recent structure versions: {(project_id, signature): analysis}
+ANALYSIS_CACHE_SIZE = 128
+_analysis_cache: "OrderedDict[Tuple[str, Tuple[int, int, int]], Dict[str, Any]]" = OrderedDict()
+_analysis_cache_lock = threading.Lock()
+
+def _analyze_project(project_id: str) -> Dict[str, Any]:
+    """Analyze and validate a project's flow, reusing the result until structure.json changes"""
+    key = (project_id, project_structure.get_structure_signature(project_id))
+    with _analysis_cache_lock:
+        cached = _analysis_cache.get(key)
+        if cached is not None:
+            _analysis_cache.move_to_end(key)
+            return cached
+    
+    structure = project_structure.get_project_structure(project_id)
+    nodes = structure.get('nodes', [])
+    edges = structure.get('edges', [])
+    
+    # Perform analysis
+    analysis = FlowAnalyzer.analyze_flow_structure(nodes, edges)
+    
+    # Validate flow
+    is_valid, errors = FlowAnalyzer.validate_flow(nodes, edges)
+    analysis['is_valid'] = is_valid
+    analysis['validation_errors'] = errors
+    
+    with _analysis_cache_lock:
+        _analysis_cache[key] = analysis
+        if len(_analysis_cache) > ANALYSIS_CACHE_SIZE:
+            _analysis_cache.popitem(last=False)
+    return analysis
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an ETag against an If-None-Match header value"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+def get_executor(request: Request) -> EnhancedFlowExecutor:
+    """Get the shared executor built at startup, which keeps the object store across requests"""
+    return request.app.state.flow_executor
 
 # Request/Response Models
-class CreateProjectRequest(BaseModel):
+class _RequestModel(BaseModel):
+    """Immutable request body; handlers only read the parsed fields"""
+    model_config = ConfigDict(frozen=True)
+
+class CreateProjectRequest(_RequestModel):
     project_name: str
     project_description: str
     project_id: str
 
-class DeleteProjectRequest(BaseModel):
+class DeleteProjectRequest(_RequestModel):
     project_name: str
     project_id: str
 
-class CreateNodeRequest(BaseModel):
+class CreateNodeRequest(_RequestModel):
     project_id: str
     node_id: str
     node_type: str = "custom"
     position: Dict[str, float]
-    data: Dict[str, Any]
+    data: dict
 
-class DeleteNodeRequest(BaseModel):
+class DeleteNodeRequest(_RequestModel):
     project_id: str
     node_id: str
 
-class UpdateNodePositionRequest(BaseModel):
+class UpdateNodePositionRequest(_RequestModel):
     project_id: str
     node_id: str
     position: Dict[str, float]
 
-class CreateEdgeRequest(BaseModel):
+class CreateEdgeRequest(_RequestModel):
     project_id: str
     edge_id: str
     edge_type: str = "bezier"
@@ -69,24 +176,99 @@ class CreateEdgeRequest(BaseModel):
     target: str
     source_handle: Optional[str] = None
     target_handle: Optional[str] = None
-    marker_end: Optional[Dict[str, Any]] = None
+    marker_end: Optional[dict] = None
 
-class DeleteEdgeRequest(BaseModel):
+class DeleteEdgeRequest(_RequestModel):
     project_id: str
     edge_id: str
 
-class ExecuteFlowRequest(BaseModel):
+class UpdateEdgeRequest(_RequestModel):
+    project_id: str
+    edge_id: str
+    source_handle: Optional[str] = None
+    target_handle: Optional[str] = None
+
+# Batch operations: the single-operation request fields without project_id
+class CreateNodeOp(_RequestModel):
+    type: Literal["create_node"]
+    node_id: str
+    node_type: str = "custom"
+    position: Dict[str, float]
+    data: dict
+
+class DeleteNodeOp(_RequestModel):
+    type: Literal["delete_node"]
+    node_id: str
+
+class UpdateNodePositionOp(_RequestModel):
+    type: Literal["update_node_position"]
+    node_id: str
+    position: Dict[str, float]
+
+class CreateEdgeOp(_RequestModel):
+    type: Literal["create_edge"]
+    edge_id: str
+    edge_type: str = "bezier"
+    source: str
+    target: str
+    source_handle: Optional[str] = None
+    target_handle: Optional[str] = None
+    marker_end: Optional[dict] = None
+
+class DeleteEdgeOp(_RequestModel):
+    type: Literal["delete_edge"]
+    edge_id: str
+
+class UpdateEdgeOp(_RequestModel):
+    type: Literal["update_edge"]
+    edge_id: str
+    source_handle: Optional[str] = None
+    target_handle: Optional[str] = None
+
+BatchOp = Annotated[
+    Union[CreateNodeOp, DeleteNodeOp, UpdateNodePositionOp, CreateEdgeOp, DeleteEdgeOp, UpdateEdgeOp],
+    Field(discriminator="type")
+]
+
+class BatchMutationRequest(_RequestModel):
+    project_id: str
+    ops: List[BatchOp]
+
+class ExecuteFlowRequest(_RequestModel):
     project_id: str
     start_node_id: Optional[str] = None
-    params: Dict[str, Any] = Field(default_factory=dict)
-    result_node_values: Dict[str, Any] = Field(default_factory=dict)
+    params: dict = Field(default_factory=dict)
+    result_node_values: dict = Field(default_factory=dict)
     max_workers: int = Field(default=4, ge=1, le=10)
     timeout_sec: int = Field(default=30, ge=1, le=300)
     halt_on_error: bool = True
 
-class AnalyzeFlowRequest(BaseModel):
+class AnalyzeFlowRequest(_RequestModel):
     project_id: str
 
+async def parse_execute_flow_request(http_request: Request) -> ExecuteFlowRequest:
+    """Parse and validate an execute-flow body in one pass with pydantic's JSON parser"""
+    try:
+        return ExecuteFlowRequest.model_validate_json(await http_request.body())
+    except ValidationError as e:
+        # Report errors the way FastAPI's own body validation does: under
+        # "body", and without echoing an unparseable body back as input
+        errors = []
+        for error in e.errors(include_url=False):
+            error = {**error, "loc": ("body", *error["loc"])}
+            if error["type"] == "json_invalid":
+                error["input"] = {}
+            errors.append(error)
+        raise RequestValidationError(errors)
+
+# The execute-flow body is parsed by a dependency, so document it explicitly
+EXECUTE_FLOW_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {"application/json": {"schema": ExecuteFlowRequest.model_json_schema()}}
+    }
+}
+
 
 
 
@@ -94,73 +276,34 @@ class AnalyzeFlowRequest(BaseModel):
 async def get_all_projects():
     """Get all project names from the projects folder"""
     try:
-        projects = project_operations.get_all_projects()
-        return {
+        projects = await asyncio.to_thread(project_operations.get_all_projects)
+        return ORJSONResponse({
             "success": True,
             "projects": projects
-        }
+        })
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/{project_id}")
-async def get_project(project_id: str):
+@router.get("/{project_id}", response_class=ORJSONResponse)
+async def get_project(project_id: str, request: Request):
     """Get a specific project's node-edge structure by project_id"""
     try:
-        structure = project_structure.get_project_structure(project_id)
+        # The structure file signature changes on every save, so it doubles as
+        # a (weak, since it is not derived from the bytes) ETag
+        ino, mtime_ns, size = project_structure.get_structure_signature(project_id)
+        etag = f'W/"{ino:x}-{mtime_ns:x}-{size:x}"'
+        if _etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers={"ETag": etag})
         
-        # Ensure the structure has all required fields for ReactFlow
-        # Validate and add default values for nodes
-        for node in structure.get("nodes", []):
-            # Ensure node has required fields
-            if "data" not in node:
-                node["data"] = {}
-            if "title" not in node["data"]:
-                node["data"]["title"] = f"Node {node.get('id', 'unknown')}"
-            if "description" not in node["data"]:
-                node["data"]["description"] = ""
-            
-            # Ensure position exists with default values
-            if "position" not in node:
-                node["position"] = {"x": 100, "y": 100}
-            elif not isinstance(node["position"], dict):
-                node["position"] = {"x": 100, "y": 100}
-            elif "x" not in node["position"] or "y" not in node["position"]:
-                node["position"]["x"] = node["position"].get("x", 100)
-                node["position"]["y"] = node["position"].get("y", 100)
+        structure = await project_structure.get_project_structure_async(project_id)
         
-        # Validate edges
-        for edge in structure.get("edges", []):
-            # Ensure edge has minimum required fields
-            if "source" not in edge or "target" not in edge:
-                continue  # Skip invalid edges
-            
-            # Add optional fields with null as default
-            if "sourceHandle" not in edge:
-                edge["sourceHandle"] = None
-            if "targetHandle" not in edge:
-                edge["targetHandle"] = None
-            
-            # Ensure markerEnd has correct format for ReactFlow
-            if "markerEnd" not in edge:
-                edge["markerEnd"] = {"type": "arrowclosed"}
-            elif isinstance(edge.get("markerEnd"), dict):
-                # Normalize markerEnd type to lowercase for ReactFlow compatibility
-                marker_type = edge["markerEnd"].get("type", "arrowclosed")
-                if isinstance(marker_type, str):
-                    # Convert to lowercase and handle common variations
-                    marker_type_lower = marker_type.lower()
-                    if marker_type_lower in ["arrowclosed", "arrow"]:
-                        edge["markerEnd"]["type"] = marker_type_lower
-                    elif marker_type_lower == "arrowclosed" or "closed" in marker_type_lower:
-                        edge["markerEnd"]["type"] = "arrowclosed"
-                    else:
-                        edge["markerEnd"]["type"] = "arrowclosed"  # Default
-        
-        return {
-            "success": True,
-            "project": structure
-        }
+        # Structure is already normalized for ReactFlow when loaded and holds
+        # only JSON values, so serialize it directly with orjson
+        return ORJSONResponse(
+            {"success": True, "project": structure},
+            headers={"ETag": etag}
+        )
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
@@ -171,8 +314,13 @@ async def get_project(project_id: str):
 async def make_project(request: CreateProjectRequest):
     """Create a new project with folder and json file"""
     try:
-        result = project_operations.create_project(request.project_name, request.project_description, request.project_id)
-        return result
+        result = await asyncio.to_thread(
+            project_operations.create_project,
+            request.project_name,
+            request.project_description,
+            request.project_id
+        )
+        return ORJSONResponse(result)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -180,16 +328,27 @@ async def make_project(request: CreateProjectRequest):
 
 
 @router.delete("/delete")
-async def delete_project(request: DeleteProjectRequest):
+async def delete_project(
+    request: DeleteProjectRequest,
+    flow_executor: EnhancedFlowExecutor = Depends(get_executor)
+):
     """Delete entire project folder"""
     try:
-        result = project_operations.delete_project(request.project_name, request.project_id)
+        result = await asyncio.to_thread(
+            project_operations.delete_project,
+            request.project_name,
+            request.project_id
+        )
         
-        # Clean up object store for this project
-        executor = get_executor()
-        executor.cleanup_project_store(request.project_id)
+        # Drop the cached structure and node code, and clean up object store for this project
+        project_structure.invalidate_project_structure(request.project_id)
+        node_operations.invalidate_project_code(request.project_id)
+        flow_executor.cleanup_project_store(request.project_id)
         
-        return result
+        # Stop warm workers running inside the deleted folder
+        await worker_pool.discard(request.project_id)
+        
+        return ORJSONResponse(result)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
@@ -200,14 +359,15 @@ async def delete_project(request: DeleteProjectRequest):
 async def make_node(request: CreateNodeRequest):
     """Create a new node with corresponding python file"""
     try:
-        result = node_operations.create_node(
+        result = await asyncio.to_thread(
+            node_operations.create_node,
             request.project_id,
             request.node_id,
             request.node_type,
             request.position,
             request.data
         )
-        return result
+        return ORJSONResponse(result)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -218,8 +378,8 @@ async def make_node(request: CreateNodeRequest):
 async def delete_node(request: DeleteNodeRequest):
     """Delete a node and its python file"""
     try:
-        result = node_operations.delete_node(request.project_id, request.node_id)
-        return result
+        result = await asyncio.to_thread(node_operations.delete_node, request.project_id, request.node_id)
+        return ORJSONResponse(result)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
@@ -230,12 +390,13 @@ async def delete_node(request: DeleteNodeRequest):
 async def update_node_position(request: UpdateNodePositionRequest):
     """Update node position in project structure"""
     try:
-        result = node_operations.update_node_position(
+        result = await asyncio.to_thread(
+            node_operations.update_node_position,
             request.project_id,
             request.node_id,
             request.position
         )
-        return result
+        return ORJSONResponse(result)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
@@ -246,7 +407,8 @@ async def update_node_position(request: UpdateNodePositionRequest):
 async def make_edge(request: CreateEdgeRequest):
     """Create a new edge between nodes"""
     try:
-        result = edge_operations.create_edge(
+        result = await asyncio.to_thread(
+            edge_operations.create_edge,
             request.project_id,
             request.edge_id,
             request.edge_type,
@@ -256,7 +418,7 @@ async def make_edge(request: CreateEdgeRequest):
             request.source_handle,
             request.target_handle
         )
-        return result
+        return ORJSONResponse(result)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -267,23 +429,39 @@ async def make_edge(request: CreateEdgeRequest):
 async def delete_edge(request: DeleteEdgeRequest):
     """Delete an edge"""
     try:
-        result = edge_operations.delete_edge(request.project_id, request.edge_id)
-        return result
+        result = await asyncio.to_thread(edge_operations.delete_edge, request.project_id, request.edge_id)
+        return ORJSONResponse(result)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/batch-mutations")
+async def batch_mutations(request: BatchMutationRequest):
+    """Apply several node/edge operations with a single structure read and write"""
+    try:
+        result = await asyncio.to_thread(
+            batch_operations.apply_mutations,
+            request.project_id,
+            [op.model_dump() for op in request.ops]
+        )
+        return ORJSONResponse(result)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/execute-flow")
-async def execute_flow(request: ExecuteFlowRequest):
+@router.post("/execute-flow", openapi_extra=EXECUTE_FLOW_OPENAPI)
+async def execute_flow(
+    request: ExecuteFlowRequest = Depends(parse_execute_flow_request),
+    flow_executor: EnhancedFlowExecutor = Depends(get_executor)
+):
     """Execute the node flow starting from start node"""
     try:
-        # Use global executor to maintain object store
-        executor = get_executor()
-        
-        # Execute the flow
-        result = await executor.execute_flow(
+        # Execute the flow on the global executor to maintain object store
+        result = await flow_executor.execute_flow(
             project_id=request.project_id,
             start_node_id=request.start_node_id,
             params=request.params,
@@ -293,7 +471,9 @@ async def execute_flow(request: ExecuteFlowRequest):
             halt_on_error=request.halt_on_error
         )
         
-        return result
+        # Result nodes carry raw node outputs; ORJSONResponse falls back to
+        # jsonable_encoder for values orjson cannot encode
+        return ORJSONResponse(result)
         
     except FileNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
@@ -303,44 +483,82 @@ async def execute_flow(request: ExecuteFlowRequest):
         raise HTTPException(status_code=500, detail=f"Flow execution failed: {str(e)}")
 
 
-@router.post("/execute-flow-stream")
-async def execute_flow_stream(request: ExecuteFlowRequest):
+@router.post("/execute-flow-stream", openapi_extra=EXECUTE_FLOW_OPENAPI)
+async def execute_flow_stream(
+    http_request: Request,
+    request: ExecuteFlowRequest = Depends(parse_execute_flow_request),
+    flow_executor: EnhancedFlowExecutor = Depends(get_executor)
+):
     """Execute the node flow with streaming results via SSE"""
     async def event_generator():
         try:
-            executor = get_executor()
+            # Run the flow in its own task so execution overlaps with sending
+            queue: asyncio.Queue = asyncio.Queue(maxsize=SSE_QUEUE_SIZE)
+            producer = asyncio.create_task(_forward_events(
+                flow_executor.execute_flow_streaming(
+                    project_id=request.project_id,
+                    start_node_id=request.start_node_id,
+                    params=request.params,
+                    result_node_values=request.result_node_values,
+                    max_workers=request.max_workers,
+                    timeout_sec=request.timeout_sec,
+                    halt_on_error=request.halt_on_error
+                ),
+                queue
+            ))
             
-            # Execute flow with streaming
-            async for node_result in executor.execute_flow_streaming(
-                project_id=request.project_id,
-                start_node_id=request.start_node_id,
-                params=request.params,
-                result_node_values=request.result_node_values,
-                max_workers=request.max_workers,
-                timeout_sec=request.timeout_sec,
-                halt_on_error=request.halt_on_error
-            ):
-                # Send each node result as SSE event
-                event_data = json.dumps(node_result)
-                yield f"data: {event_data}\n\n"
-                await asyncio.sleep(0.01)  # Small delay to ensure proper streaming
+            try:
+                finished = False
+                while not finished:
+                    # Take the next result plus any others already waiting
+                    items = [await queue.get()]
+                    while len(items) < SSE_MAX_BATCH and not queue.empty():
+                        items.append(queue.get_nowait())
+                    
+                    batch = []
+                    failure = None
+                    for item in items:
+                        if item is _STREAM_END:
+                            finished = True
+                        elif isinstance(item, Exception):
+                            failure = item
+                        else:
+                            batch.append(item)
+                    
+                    # Send the node results as a single SSE event
+                    if batch:
+                        yield _encode_sse_events(batch)
+                    if failure is not None:
+                        raise failure
+            finally:
+                # Stop the flow if the client went away mid-stream
+                producer.cancel()
                 
         except Exception as e:
             # Send error event
-            error_event = json.dumps({
+            error_event = orjson.dumps({
                 "type": "error",
                 "error": str(e)
             })
-            yield f"data: {error_event}\n\n"
+            yield SSE_PREFIX + error_event + SSE_SUFFIX
+    
+    headers = {
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",  # Disable Nginx buffering
+        "Connection": "keep-alive",
+        "Vary": "Accept-Encoding"
+    }
+    body = event_generator()
+    
+    # JSON results compress well; the browser decodes gzip transparently
+    if _accepts_gzip(http_request.headers.get("accept-encoding")):
+        headers["Content-Encoding"] = "gzip"
+        body = _gzip_stream(body)
     
     return StreamingResponse(
-        event_generator(),
+        body,
         media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "X-Accel-Buffering": "no",  # Disable Nginx buffering
-            "Connection": "keep-alive"
-        }
+        headers=headers
     )
 
 
@@ -348,24 +566,14 @@ async def execute_flow_stream(request: ExecuteFlowRequest):
 async def analyze_flow(request: AnalyzeFlowRequest):
     """Analyze the flow structure for validation and optimization"""
     try:
-        # Get project structure
-        structure = project_structure.get_project_structure(request.project_id)
-        nodes = structure.get('nodes', [])
-        edges = structure.get('edges', [])
-        
-        # Perform analysis
-        analysis = FlowAnalyzer.analyze_flow_structure(nodes, edges)
-        
-        # Validate flow
-        is_valid, errors = FlowAnalyzer.validate_flow(nodes, edges)
-        analysis['is_valid'] = is_valid
-        analysis['validation_errors'] = errors
+        # Graph analysis is CPU-bound; keep it off the event loop
+        analysis = await asyncio.to_thread(_analyze_project, request.project_id)
         
-        return {
+        return ORJSONResponse({
             "success": True,
             "project_id": request.project_id,
             "analysis": analysis
-        }
+        })
         
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
@@ -373,53 +581,19 @@ async def analyze_flow(request: AnalyzeFlowRequest):
         raise HTTPException(status_code=500, detail=f"Flow analysis failed: {str(e)}")
 
 @router.put("/updateedge")
-async def update_edge(request: dict):
+async def update_edge(request: UpdateEdgeRequest):
     """
     Update edge handles when node ports change.
     """
     try:
-        project_id = request.get('project_id')
-        edge_id = request.get('edge_id')
-        source_handle = request.get('source_handle')
-        target_handle = request.get('target_handle')
-        
-        if not project_id or not edge_id:
-            raise ValueError("project_id and edge_id are required")
-        
-        # Load project structure
-        project_path = Path(PROJECTS_DIR) / project_id
-        structure_file = project_path / "structure.json"
-        
-        if not structure_file.exists():
-            raise ValueError(f"Project {project_id} not found")
-        
-        with open(structure_file, 'r') as f:
-            structure = json.load(f)
-        
-        # Find and update the edge
-        edges = structure.get('edges', [])
-        edge_found = False
-        
-        for edge in edges:
-            if edge['id'] == edge_id:
-                if source_handle is not None:
-                    edge['sourceHandle'] = source_handle
-                if target_handle is not None:
-                    edge['targetHandle'] = target_handle
-                edge_found = True
-                break
-        
-        if not edge_found:
-            raise ValueError(f"Edge {edge_id} not found")
-        
-        # Save updated structure
-        with open(structure_file, 'w') as f:
-            json.dump(structure, f, indent=2)
-        
-        return {
-            "success": True,
-            "message": f"Edge {edge_id} updated successfully"
-        }
+        result = await asyncio.to_thread(
+            edge_operations.update_edge,
+            request.project_id,
+            request.edge_id,
+            request.source_handle,
+            request.target_handle
+        )
+        return ORJSONResponse(result)
         
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
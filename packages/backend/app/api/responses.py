@@ -0,0 +1,42 @@
+from typing import Any
+import json
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse as _ORJSONResponse
+
+def _orjson_default(obj: Any) -> Any:
+    """Convert values orjson cannot encode natively, as jsonable_encoder would"""
+    if isinstance(obj, float):
+        return float(obj)
+    encoded = jsonable_encoder(obj)
+    if encoded is obj:
+        raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+    return encoded
+
+def dumps_json(content: Any) -> bytes:
+    """
+    Encode content as JSON with orjson, falling back to the stdlib encoder
+    
+    Flow results can hold arbitrary node outputs (sets, numpy scalars,
+    custom objects, integers past 64 bits); those go through the same
+    jsonable_encoder conversion the default JSONResponse applied.
+    """
+    try:
+        return orjson.dumps(
+            content,
+            default=_orjson_default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
+    except TypeError:
+        return json.dumps(
+            jsonable_encoder(content),
+            ensure_ascii=False,
+            allow_nan=False,
+            separators=(",", ":"),
+        ).encode("utf-8")
+
+class ORJSONResponse(_ORJSONResponse):
+    """ORJSONResponse that also accepts the non-string dict keys json.dumps allowed"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps_json(content)
@@ -0,0 +1,46 @@
+"""
+Batch Operations Module
+Applies several node/edge mutations to a project with a single structure write
+"""
+
+from typing import Dict, Any, List
+from . import node_operations, edge_operations
+from .project_structure import structure_batch
+
+# Operation types accepted in a batch, with the function applying each one
+OPERATIONS = {
+    "create_node": node_operations.create_node,
+    "delete_node": node_operations.delete_node,
+    "update_node_position": node_operations.update_node_position,
+    "create_edge": edge_operations.create_edge,
+    "delete_edge": edge_operations.delete_edge,
+    "update_edge": edge_operations.update_edge,
+}
+
+def apply_mutations(project_id: str, ops: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Apply operations in order and save the structure once
+    
+    Each op is {"type": <operation>, **arguments}. A failing op does not stop
+    the batch; its entry in "results" carries the error instead. Node files
+    removed by the batch are only deleted once the structure is saved.
+    """
+    results = []
+    with structure_batch(project_id):
+        for op in ops:
+            arguments = dict(op)
+            op_type = arguments.pop("type", None)
+            operation = OPERATIONS.get(op_type)
+            if operation is None:
+                results.append({"success": False, "error": f"Unknown operation type '{op_type}'"})
+                continue
+            
+            try:
+                results.append(operation(project_id, **arguments))
+            except Exception as e:
+                results.append({"success": False, "error": str(e)})
+    
+    return {
+        "success": all(result["success"] for result in results),
+        "results": results
+    }
@@ -1,72 +1,108 @@
 from typing import Dict, Any, Optional
+from .project_structure import get_project_structure_for_update, save_project_structure, structure_lock
+from .structure_normalize import normalize_edge
+
+# Edge fields set explicitly by create_edge; extra kwargs cannot override them
+_EDGE_RESERVED = frozenset({
+    "id", "type", "source", "target", "sourceHandle", "targetHandle", "markerEnd",
+    "source_handle", "target_handle"
+})
 
 def create_edge(project_id: str, edge_id: str, edge_type: str, source: str, target: str, 
                 marker_end: Optional[Dict] = None, source_handle: Optional[str] = None,
                 target_handle: Optional[str] = None, **kwargs) -> Dict[str, Any]:
     """Create a new edge between nodes matching React Flow structure"""
-    from .project_structure import get_project_structure, save_project_structure
-    
-    structure = get_project_structure(project_id)
-    
-    # Verify source and target nodes exist
-    node_ids = [node['id'] for node in structure['nodes']]
-    if source not in node_ids:
-        raise ValueError(f"Source node '{source}' does not exist")
-    if target not in node_ids:
-        raise ValueError(f"Target node '{target}' does not exist")
-    
-    # Check if edge already exists
-    if any(edge['id'] == edge_id for edge in structure['edges']):
-        raise ValueError(f"Edge with ID '{edge_id}' already exists")
-    
-    # Add new edge with React Flow structure
-    new_edge = {
-        "id": edge_id,
-        "type": edge_type,
-        "source": source,
-        "target": target,
-        "sourceHandle": source_handle,  # Can be None or specific handle ID
-        "targetHandle": target_handle   # Can be None or specific handle ID
-    }
-    
-    # Add markerEnd if provided
-    if marker_end:
-        new_edge["markerEnd"] = marker_end
-    else:
-        # Default markerEnd for ReactFlow (use exact string that ReactFlow expects)
-        new_edge["markerEnd"] = {"type": "arrowclosed"}
-    
-    # Add any additional properties
-    for key, value in kwargs.items():
-        if key not in ["id", "type", "source", "target", "sourceHandle", "targetHandle", "markerEnd", "source_handle", "target_handle"] and value is not None:
-            new_edge[key] = value
-    
-    structure['edges'].append(new_edge)
-    
-    save_project_structure(project_id, structure)
-    
-    return {
-        "success": True,
-        "message": f"Edge '{edge_id}' created successfully",
-        "edge": new_edge
-    }
+    with structure_lock(project_id):
+        structure = get_project_structure_for_update(project_id)
+        
+        # Verify source and target nodes exist
+        node_ids = {node['id'] for node in structure['nodes']}
+        if source not in node_ids:
+            raise ValueError(f"Source node '{source}' does not exist")
+        if target not in node_ids:
+            raise ValueError(f"Target node '{target}' does not exist")
+        
+        # Check if edge already exists
+        edge_ids = {edge['id'] for edge in structure['edges']}
+        if edge_id in edge_ids:
+            raise ValueError(f"Edge with ID '{edge_id}' already exists")
+        
+        # Add new edge with React Flow structure
+        new_edge = {
+            "id": edge_id,
+            "type": edge_type,
+            "source": source,
+            "target": target,
+            "sourceHandle": source_handle,  # Can be None or specific handle ID
+            "targetHandle": target_handle   # Can be None or specific handle ID
+        }
+        
+        # Add markerEnd if provided
+        if marker_end:
+            new_edge["markerEnd"] = marker_end
+        else:
+            # Default markerEnd for ReactFlow (use exact string that ReactFlow expects)
+            new_edge["markerEnd"] = {"type": "arrowclosed"}
+        
+        # Add any additional properties
+        for key, value in kwargs.items():
+            if value is not None and key not in _EDGE_RESERVED:
+                new_edge[key] = value
+        
+        structure['edges'].append(normalize_edge(new_edge))
+        
+        save_project_structure(project_id, structure)
+        
+        return {
+            "success": True,
+            "message": f"Edge '{edge_id}' created successfully",
+            "edge": new_edge
+        }
 
 def delete_edge(project_id: str, edge_id: str) -> Dict[str, Any]:
     """Delete an edge"""
-    from .project_structure import get_project_structure, save_project_structure
-    
-    structure = get_project_structure(project_id)
-    
-    # Check if edge exists
-    if not any(edge['id'] == edge_id for edge in structure['edges']):
-        raise ValueError(f"Edge with ID '{edge_id}' not found")
-    
-    # Remove edge
-    structure['edges'] = [e for e in structure['edges'] if e['id'] != edge_id]
-    
-    save_project_structure(project_id, structure)
-    
-    return {
-        "success": True,
-        "message": f"Edge '{edge_id}' deleted successfully"
-    }
\ No newline at end of file
+    with structure_lock(project_id):
+        structure = get_project_structure_for_update(project_id)
+        
+        # Find the edge's position
+        index = next((i for i, e in enumerate(structure['edges']) if e['id'] == edge_id), None)
+        if index is None:
+            raise ValueError(f"Edge with ID '{edge_id}' not found")
+        
+        # Remove edge in place instead of rebuilding the list
+        structure['edges'].pop(index)
+        
+        save_project_structure(project_id, structure)
+        
+        return {
+            "success": True,
+            "message": f"Edge '{edge_id}' deleted successfully"
+        }
+
+def update_edge(project_id: str, edge_id: str, source_handle: Optional[str] = None,
+                target_handle: Optional[str] = None) -> Dict[str, Any]:
+    """Update the source/target handles of an edge"""
+    with structure_lock(project_id):
+        structure = get_project_structure_for_update(project_id)
+        
+        # Find the edge with a single short-circuiting pass
+        edge = next((e for e in structure.get('edges', []) if e['id'] == edge_id), None)
+        if edge is None:
+            raise ValueError(f"Edge {edge_id} not found")
+        
+        changed = False
+        if source_handle is not None and edge.get('sourceHandle') != source_handle:
+            edge['sourceHandle'] = source_handle
+            changed = True
+        if target_handle is not None and edge.get('targetHandle') != target_handle:
+            edge['targetHandle'] = target_handle
+            changed = True
+        
+        # Only rewrite structure.json when a handle actually changed
+        if changed:
+            save_project_structure(project_id, structure)
+        
+        return {
+            "success": True,
+            "message": f"Edge {edge_id} updated successfully"
+        }
\ No newline at end of file
@@ -3,28 +3,262 @@ Enhanced Flow Executor with Object Store Support
 Enables passing Python objects between nodes without JSON serialization
 """
 
-import json
+import orjson
 import sys
 import time
 import inspect
+import itertools
+import reprlib
 import traceback
 import asyncio
-from typing import Any, Dict, Optional, List, Set, Tuple, get_type_hints, get_origin, get_args
+import threading
+from types import CodeType, FunctionType
+from typing import Any, Dict, Iterator, Optional, List, Set, Tuple, get_type_hints, get_origin, get_args
 from pathlib import Path
-from collections import defaultdict, deque
+from collections import OrderedDict, defaultdict, deque
+from contextlib import contextmanager
 import ast
+import builtins
 
-from .flow_executor import FlowExecutor
+from .flow_executor import FlowExecutor, _SANITIZE_RE
 from .execute_code import execute_python_code
 
+# Most compiled node files kept in memory per executor
+CODE_CACHE_SIZE = 512
+# Most node function signatures remembered per executor
+SIGNATURE_CACHE_SIZE = 1024
+# Outputs whose JSON is at least this many bytes are stored as references
+INLINE_OUTPUT_MAX_BYTES = 10000
+# Default byte budget of each project's object store; oldest objects are evicted past it
+OBJECT_STORE_MAX_BYTES = 1 << 30
+# orjson options of the inline-size probe; must match what responses can encode
+_INLINE_PROBE_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+# Exact types of JSON scalars; subclasses still take the isinstance path
+_SCALAR_TYPES = frozenset({str, int, float, bool, type(None)})
+
+# Bounded repr for the first item of list previews: nested containers and
+# long strings are cut off without building their full text
+_ITEM_PREVIEW = reprlib.Repr()
+_ITEM_PREVIEW.maxstring = 50
+_ITEM_PREVIEW.maxother = 50
+# A list or dict this long always encodes to INLINE_OUTPUT_MAX_BYTES or more
+# (at least two bytes per item), so it can skip the trial encode
+INLINE_OUTPUT_MAX_ITEMS = INLINE_OUTPUT_MAX_BYTES // 2
+
+def _preview_sequence(data: Any) -> str:
+    preview = f"{type(data).__name__} with {len(data)} items"
+    if len(data) > 0:
+        preview += f" (first: {_ITEM_PREVIEW.repr(data[0])})"
+    return preview
+
+def _preview_dict(data: Dict) -> str:
+    keys = list(itertools.islice(data, 3))
+    preview = f"Dict with {len(data)} keys"
+    if keys:
+        preview += f" ({', '.join(str(k) for k in keys)}{'...' if len(data) > 3 else ''})"
+    return preview
+
+def _preview_set(data: Any) -> str:
+    return f"Set with {len(data)} items"
+
+def _cheap_size(data: Any) -> int:
+    """Get an object's size in bytes from its native accessor where it has one"""
+    # numpy arrays (and anything else exposing nbytes) know their buffer size
+    nbytes = getattr(data, 'nbytes', None)
+    if isinstance(nbytes, int):
+        return nbytes
+    # pandas objects: shallow memory usage without walking object columns
+    if hasattr(data, 'memory_usage') and hasattr(data, 'columns'):
+        try:
+            return int(data.memory_usage(deep=False).values.sum())
+        except Exception:
+            pass
+    return sys.getsizeof(data)
+
+# Deepest nesting orjson encodes; deeper data is left to orjson to reject
+_JSON_MAX_DEPTH = 254
+
+def _estimate_str(s: str) -> Optional[int]:
+    # Non-ASCII text may hold lone surrogates orjson rejects; leave it to orjson
+    if not s.isascii():
+        return None
+    # Printable ASCII only grows by its quotes and escaped '"' and '\\';
+    # control characters are bounded by the six-byte \uXXXX form
+    if s.isprintable():
+        return len(s) + 2 + s.count('"') + s.count('\\')
+    return 6 * len(s) + 2
+
+def _estimate_json_size(data: Any, budget: int = INLINE_OUTPUT_MAX_BYTES, depth: int = 0) -> Optional[int]:
+    """
+    Get an upper bound on the size of data encoded as JSON
+    
+    Returns None when the bound reaches the budget or the data holds
+    anything besides exact JSON types, so callers can fall back to encoding.
+    """
+    kind = type(data)
+    if kind is str:
+        size = _estimate_str(data)
+        if size is None:
+            return None
+    elif kind is int:
+        # orjson only encodes 64-bit integers
+        if not -(1 << 63) <= data < (1 << 64):
+            return None
+        size = 20
+    elif kind is float:
+        size = 24
+    elif kind is bool or data is None:
+        size = 5
+    elif kind is list or kind is dict:
+        if depth >= _JSON_MAX_DEPTH:
+            return None
+        size = 2
+        if kind is list:
+            for item in data:
+                item_size = _estimate_json_size(item, budget - size, depth + 1)
+                if item_size is None:
+                    return None
+                size += item_size + 1
+                if size >= budget:
+                    return None
+        else:
+            for key, value in data.items():
+                key_kind = type(key)
+                if key_kind is str:
+                    key_size = _estimate_str(key)
+                    if key_size is None:
+                        return None
+                    size += key_size
+                elif key_kind in _SCALAR_TYPES:
+                    # Non-string keys are written as quoted scalars
+                    size += 26
+                else:
+                    return None
+                value_size = _estimate_json_size(value, budget - size, depth + 1)
+                if value_size is None:
+                    return None
+                size += value_size + 2
+                if size >= budget:
+                    return None
+    else:
+        return None
+    
+    return size if size < budget else None
+
+# Module-level names never picked as a node's fallback entry function
+_ENTRY_SKIP_NAMES = frozenset({
+    'json', 'sys', 'traceback', 'inspect', 'math', 'datetime',
+    'pandas', 'pd', 'numpy', 'np'
+})
+
+def _find_entry_names(tree: ast.Module) -> Tuple[str, ...]:
+    """Get the names a node module binds at top level, in entry-point priority order"""
+    names: List[str] = []
+    
+    def visit(body: List[ast.stmt]) -> None:
+        for stmt in body:
+            if isinstance(stmt, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                names.append(stmt.name)
+            elif isinstance(stmt, (ast.Import, ast.ImportFrom)):
+                names.extend((alias.asname or alias.name).split('.')[0] for alias in stmt.names)
+            elif isinstance(stmt, ast.Assign):
+                names.extend(t.id for t in stmt.targets if isinstance(t, ast.Name))
+            elif isinstance(stmt, (ast.AnnAssign, ast.AugAssign)) and isinstance(stmt.target, ast.Name):
+                names.append(stmt.target.id)
+            elif isinstance(stmt, (ast.If, ast.For, ast.AsyncFor, ast.While, ast.With, ast.AsyncWith)):
+                visit(stmt.body)
+                visit(getattr(stmt, 'orelse', []))
+            elif isinstance(stmt, ast.Try):
+                visit(stmt.body)
+                for handler in stmt.handlers:
+                    visit(handler.body)
+                visit(stmt.orelse)
+                visit(stmt.finalbody)
+    
+    visit(tree.body)
+    
+    # Priority: RunScript > main > first callable, in binding order
+    ordered = [name for name in ('RunScript', 'main') if name in names]
+    for name in dict.fromkeys(names):
+        if name not in ordered and not name.startswith('_') and name not in _ENTRY_SKIP_NAMES:
+            ordered.append(name)
+    return tuple(ordered)
+
+# Preview builders for exact built-in container types
+_PREVIEW_DISPATCH = {
+    list: _preview_sequence,
+    tuple: _preview_sequence,
+    dict: _preview_dict,
+    set: _preview_set,
+}
+
+# Safe builtins - remove dangerous functions
+SAFE_BUILTIN_NAMES = frozenset({
+    'abs', 'all', 'any', 'bool', 'dict', 'enumerate',
+    'filter', 'float', 'int', 'len', 'list', 'map',
+    'max', 'min', 'print', 'range', 'round', 'set',
+    'sorted', 'str', 'sum', 'tuple', 'type', 'zip',
+    'isinstance', 'hasattr', 'getattr', 'setattr',
+    'repr', 'hash', 'id', 'iter', 'next', 'reversed',
+    '__build_class__', 'property', 'classmethod', 'staticmethod',
+    'super', 'object', 'Exception', 'ValueError', 'TypeError',
+    'AttributeError', 'KeyError', 'IndexError', 'RuntimeError',
+    '__import__'  # Allow importing modules within node code
+})
+
+# One builtins dict shared by every node namespace; node code must never
+# mutate it. A MappingProxyType would enforce that but drops CPython's
+# specialized builtin lookups, and nodes can already reach the real
+# builtins module through __import__, so it is not an isolation boundary.
+_SAFE_BUILTINS = {k: getattr(builtins, k) for k in SAFE_BUILTIN_NAMES if hasattr(builtins, k)}
+
+# Node namespace contents shared by every execution, copied per node run;
+# the input_data slot is filled in per run and keeps the original key order
+_NAMESPACE_TEMPLATE = {
+    '__builtins__': _SAFE_BUILTINS,
+    '__name__': '__main__',  # Required for class definitions
+    'input_data': None,
+    # Standard libraries
+    'json': __import__('json'),
+    'math': __import__('math'),
+    'datetime': __import__('datetime'),
+    'time': __import__('time'),
+    'random': __import__('random'),
+    're': __import__('re'),
+    'collections': __import__('collections'),
+    'itertools': __import__('itertools'),
+    'Path': __import__('pathlib').Path,  # Add Path for file operations
+    'pathlib': __import__('pathlib'),
+    'os': __import__('os'),
+    'sys': __import__('sys'),
+    'asyncio': __import__('asyncio'),
+    'tempfile': __import__('tempfile'),
+}
+
 
 class EnhancedFlowExecutor(FlowExecutor):
     """Enhanced Flow Executor that supports Python object passing between nodes"""
     
-    def __init__(self, projects_root: str):
+    def __init__(self, projects_root: str, store_budget: int = OBJECT_STORE_MAX_BYTES):
         super().__init__(projects_root)
         # Object store for each project - stores Python objects that can't be JSON serialized
-        self.object_stores = {}  # {project_id: {ref_id: object}}
+        self.object_stores: Dict[str, "OrderedDict[str, Any]"] = {}  # {project_id: {ref_id: object}}, LRU ordered
+        # Recorded size of every stored object and the per-project totals
+        self.store_budget = store_budget
+        self._store_sizes: Dict[str, Dict[str, int]] = {}
+        self._store_bytes: Dict[str, int] = {}
+        # Nodes of one level run in parallel threads; these guard each project's store
+        self._store_locks: Dict[str, threading.Lock] = {}
+        # Flow runs in progress per project, and the refs they pinned against eviction
+        self._active_runs: Dict[str, int] = {}
+        self._run_refs: Dict[str, Set[str]] = {}
+        # Per-project sequence numbers that keep reference IDs unique
+        self._ref_counters: Dict[str, "itertools.count[int]"] = {}
+        # Compiled node files, LRU ordered: {path: (mtime_ns, size, code, entry_names)}
+        self._code_cache: "OrderedDict[str, Tuple[int, int, CodeType, Tuple[str, ...]]]" = OrderedDict()
+        self._code_cache_lock = threading.Lock()
+        # Parameter names and has-default flags per function code object
+        self._sig_cache: Dict[Tuple, Tuple[Tuple[str, ...], Tuple[bool, ...]]] = {}
         
     def _execute_node_isolated(
         self,
@@ -154,20 +388,16 @@ class EnhancedFlowExecutor(FlowExecutor):
         file_name = node_data.get("data", {}).get("file")
         if not file_name:
             title = node_data.get("data", {}).get("title", f"Node_{node_id}")
-            sanitized_title = "".join(
-                c if c.isalnum() or c == "_" else "_" for c in title
-            )
+            sanitized_title = _SANITIZE_RE.sub("_", title)
             file_name = f"{node_id}_{sanitized_title}.py"
         
-        file_path = self.projects_root / project_id / file_name
+        file_path = self._project_dir(project_id) / file_name
         
-        if not file_path.exists():
+        try:
+            node_code, entry_names = self._get_compiled_code(file_path)
+        except FileNotFoundError:
             raise FileNotFoundError(f"Node file '{file_name}' not found")
         
-        # Read node code
-        with open(file_path, 'r', encoding='utf-8') as f:
-            node_code = f.read()
-        
         # Create safe execution namespace
         namespace = self._create_safe_namespace(input_data)
         
@@ -178,20 +408,19 @@ class EnhancedFlowExecutor(FlowExecutor):
         result = None
         function_found = False
         
-        # Priority: RunScript > main > first callable
-        if 'RunScript' in namespace and callable(namespace['RunScript']):
-            result = self._call_function_with_input(namespace['RunScript'], input_data)
-            function_found = True
-        elif 'main' in namespace and callable(namespace['main']):
-            result = self._call_function_with_input(namespace['main'], input_data)
-            function_found = True
+        # Priority: RunScript > main > first callable, resolved when compiling
+        for name in entry_names:
+            obj = namespace.get(name)
+            if callable(obj):
+                result = self._call_function_with_input(obj, input_data)
+                function_found = True
+                break
         else:
-            # Find first callable function
+            # Names bound dynamically are invisible to the compile-time scan;
+            # the helpers every namespace starts with are never entry points
             for name, obj in namespace.items():
-                if callable(obj) and not name.startswith('_') and name not in [
-                    'json', 'sys', 'traceback', 'inspect', 'math', 'datetime',
-                    'pandas', 'pd', 'numpy', 'np'
-                ]:
+                if (callable(obj) and not name.startswith('_') and name not in _ENTRY_SKIP_NAMES
+                        and name not in _NAMESPACE_TEMPLATE):
                     result = self._call_function_with_input(obj, input_data)
                     function_found = True
                     break
@@ -201,59 +430,73 @@ class EnhancedFlowExecutor(FlowExecutor):
         
         return result
     
+    def _get_compiled_code(self, file_path: Path) -> Tuple[CodeType, Tuple[str, ...]]:
+        """Compile a node file and find its entry names, reusing both until the file changes"""
+        
+        stat = file_path.stat()
+        key = str(file_path)
+        with self._code_cache_lock:
+            cached = self._code_cache.get(key)
+            if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+                self._code_cache.move_to_end(key)
+                return cached[2], cached[3]
+        
+        tree = ast.parse(file_path.read_bytes(), key)
+        code = compile(tree, key, 'exec', dont_inherit=True)
+        entry_names = _find_entry_names(tree)
+        
+        with self._code_cache_lock:
+            self._code_cache[key] = (stat.st_mtime_ns, stat.st_size, code, entry_names)
+            self._code_cache.move_to_end(key)
+            if len(self._code_cache) > CODE_CACHE_SIZE:
+                self._code_cache.popitem(last=False)
+        return code, entry_names
+    
     def _create_safe_namespace(self, input_data: Any) -> Dict:
         """Create a safe execution namespace with limited builtins"""
         
-        # Safe builtins - remove dangerous functions
-        safe_builtins = {
-            'abs', 'all', 'any', 'bool', 'dict', 'enumerate',
-            'filter', 'float', 'int', 'len', 'list', 'map',
-            'max', 'min', 'print', 'range', 'round', 'set',
-            'sorted', 'str', 'sum', 'tuple', 'type', 'zip',
-            'isinstance', 'hasattr', 'getattr', 'setattr',
-            'repr', 'hash', 'id', 'iter', 'next', 'reversed',
-            '__build_class__', 'property', 'classmethod', 'staticmethod',
-            'super', 'object', 'Exception', 'ValueError', 'TypeError',
-            'AttributeError', 'KeyError', 'IndexError', 'RuntimeError',
-            '__import__'  # Allow importing modules within node code
-        }
-        
-        # Get the actual builtins based on how they're available
-        import builtins
-        
-        namespace = {
-            '__builtins__': {k: getattr(builtins, k) for k in safe_builtins 
-                           if hasattr(builtins, k)},
-            '__name__': '__main__',  # Required for class definitions
-            'input_data': input_data,
-            # Standard libraries
-            'json': __import__('json'),
-            'math': __import__('math'),
-            'datetime': __import__('datetime'),
-            'time': __import__('time'),
-            'random': __import__('random'),
-            're': __import__('re'),
-            'collections': __import__('collections'),
-            'itertools': __import__('itertools'),
-            'Path': __import__('pathlib').Path,  # Add Path for file operations
-            'pathlib': __import__('pathlib'),
-            'os': __import__('os'),
-            'sys': __import__('sys'),
-            'asyncio': __import__('asyncio'),
-            'tempfile': __import__('tempfile'),
-        }
+        # Copy the prebuilt template; the builtins dict is shared, not copied
+        namespace = _NAMESPACE_TEMPLATE.copy()
+        namespace['input_data'] = input_data
         
         # Don't import pandas/numpy here - let nodes import them if needed
         # This avoids import errors affecting all nodes
         
         return namespace
     
+    def _get_call_plan(self, func: callable) -> Tuple[Tuple[str, ...], Tuple[bool, ...]]:
+        """Get a callable's parameter names and which of them have defaults"""
+        
+        # Plain functions re-created from the same cached code object share
+        # a signature; wrapped or custom-signature callables are not cached
+        key = None
+        if (
+            isinstance(func, FunctionType)
+            and not hasattr(func, '__wrapped__')
+            and not hasattr(func, '__signature__')
+        ):
+            key = (func.__code__, len(func.__defaults__ or ()), tuple(func.__kwdefaults__ or ()))
+            plan = self._sig_cache.get(key)
+            if plan is not None:
+                return plan
+        
+        sig = inspect.signature(func)
+        plan = (
+            tuple(sig.parameters),
+            tuple(p.default is not inspect.Parameter.empty for p in sig.parameters.values())
+        )
+        
+        if key is not None:
+            if len(self._sig_cache) >= SIGNATURE_CACHE_SIZE:
+                self._sig_cache.clear()
+            self._sig_cache[key] = plan
+        return plan
+    
     def _call_function_with_input(self, func: callable, input_data: Any) -> Any:
         """Call a function with appropriate input handling for RunScript pattern"""
         
         try:
-            sig = inspect.signature(func)
-            params = list(sig.parameters.keys())
+            params, has_default = self._get_call_plan(func)
             
             # No parameters - call without arguments
             if len(params) == 0:
@@ -263,18 +506,13 @@ class EnhancedFlowExecutor(FlowExecutor):
             if func.__name__ == "RunScript":
                 # RunScript always uses keyword arguments from input_data dict
                 if isinstance(input_data, dict):
-                    # Build kwargs mapping input_data keys to function parameters
-                    kwargs = {}
-                    for param_name, param in sig.parameters.items():
-                        if param_name in input_data:
-                            # Use value from input_data
-                            kwargs[param_name] = input_data[param_name]
-                        elif param.default is not inspect.Parameter.empty:
-                            # Parameter has default, will use it
-                            pass
-                        else:
-                            # Required parameter missing - skip it to use Python's default behavior
-                            pass
+                    # Build kwargs mapping input_data keys to function parameters;
+                    # missing parameters are left to their defaults (or Python's error)
+                    kwargs = {
+                        param_name: input_data[param_name]
+                        for param_name in params
+                        if param_name in input_data
+                    }
                     
                     return func(**kwargs)
                 else:
@@ -290,10 +528,10 @@ class EnhancedFlowExecutor(FlowExecutor):
             if isinstance(input_data, dict) and len(params) > 1:
                 # Try to map dict keys to function parameters
                 kwargs = {}
-                for param_name in params:
+                for param_name, param_has_default in zip(params, has_default):
                     if param_name in input_data:
                         kwargs[param_name] = input_data[param_name]
-                    elif sig.parameters[param_name].default is not inspect.Parameter.empty:
+                    elif param_has_default:
                         # Use default value if available
                         pass
                     else:
@@ -332,53 +570,109 @@ class EnhancedFlowExecutor(FlowExecutor):
                 return func()
     
     def _unwrap_input(self, project_id: str, data: Any) -> Any:
-        """Convert references to actual objects from the object store"""
-        
-        if data is None:
-            return None
+        """
+        Convert references to actual objects from the object store
+        
+        Containers are copied only along the paths that hold a reference;
+        data without references is returned as the same object.
+        """
+        
+        # Exact dicts and lists dispatch on type(); subclasses fall back to isinstance
+        handler = _UNWRAP_DISPATCH.get(type(data))
+        if handler is not None:
+            return handler(self, project_id, data)
+        if type(data) in _SCALAR_TYPES:
+            return data
+        if isinstance(data, dict):
+            return self._unwrap_dict(project_id, data)
+        if isinstance(data, list):
+            return self._unwrap_list(project_id, data)
         
+        # Return as-is for primitive types
+        return data
+    
+    def _unwrap_dict(self, project_id: str, data: Dict) -> Any:
         # Handle reference objects
-        if isinstance(data, dict):
-            # Check if this is a reference object
-            if data.get("type") == "reference" and "ref" in data:
-                ref = data["ref"]
-                if project_id in self.object_stores:
-                    if ref in self.object_stores[project_id]:
-                        return self.object_stores[project_id][ref]
+        if data.get("type") == "reference" and "ref" in data:
+            ref = data["ref"]
+            with self._store_lock(project_id):
+                store = self.object_stores.get(project_id)
+                if store is not None:
+                    if ref in store:
+                        store.move_to_end(ref)
+                        # Keep it for the rest of the run that is reading it
+                        if project_id in self._run_refs:
+                            self._run_refs[project_id].add(ref)
+                        return store[ref]
                     else:
                         # Reference not found - return preview if available
                         return data.get("preview", None)
                 return None
-            
-            # Recursively unwrap dict values
-            unwrapped = {}
-            for key, value in data.items():
-                unwrapped[key] = self._unwrap_input(project_id, value)
-            return unwrapped
         
-        # Handle lists
-        if isinstance(data, list):
-            return [self._unwrap_input(project_id, item) for item in data]
-        
-        # Return as-is for primitive types
-        return data
+        # Unwrap nested values, copying this dict on the first change
+        unwrapped = None
+        for key, value in data.items():
+            if type(value) in _SCALAR_TYPES:
+                continue
+            new_value = self._unwrap_input(project_id, value)
+            if new_value is not value:
+                if unwrapped is None:
+                    unwrapped = dict(data)
+                unwrapped[key] = new_value
+        return data if unwrapped is None else unwrapped
+    
+    def _unwrap_list(self, project_id: str, data: List) -> Any:
+        # Unwrap nested items, copying this list on the first change
+        unwrapped = None
+        for index, item in enumerate(data):
+            if type(item) in _SCALAR_TYPES:
+                continue
+            new_item = self._unwrap_input(project_id, item)
+            if new_item is not item:
+                if unwrapped is None:
+                    unwrapped = list(data)
+                unwrapped[index] = new_item
+        return data if unwrapped is None else unwrapped
     
     def _wrap_output(self, project_id: str, node_id: str, data: Any) -> Any:
         """Wrap output data - use JSON for small data, references for large/complex objects"""
         
-        # Primitive types pass through directly
-        if data is None or isinstance(data, (bool, int, float, str)):
+        kind = type(data)
+        if kind not in _SCALAR_TYPES:
+            if getattr(data, 'ndim', None) == 0 and hasattr(data, 'item'):
+                # numpy scalars and 0-d arrays inline as the Python scalar they hold
+                data = data.item()
+            elif isinstance(data, float):
+                data = float(data)
+            elif isinstance(data, int):
+                data = int(data)
+            elif isinstance(data, str):
+                data = str(data)
+            kind = type(data)
+        
+        # Exact primitive types pass through directly; integers orjson cannot
+        # encode take the probe below
+        if kind in _SCALAR_TYPES and (kind is not int or -(1 << 63) <= data < (1 << 64)):
             return data
         
+        # Arrays/DataFrames and long containers never pass inline; skip encoding them
+        ndim = getattr(data, 'ndim', 0)
+        too_large = (isinstance(ndim, int) and ndim > 0) or (
+            isinstance(data, (list, dict)) and len(data) >= INLINE_OUTPUT_MAX_ITEMS
+        )
+        
         # Try JSON serialization for small data
-        try:
-            json_str = json.dumps(data)
-            # If serializable and under 10KB, return directly
-            if len(json_str) < 10000:
+        if not too_large:
+            # Plain JSON data whose size bound fits needs no trial encode
+            if _estimate_json_size(data) is not None:
                 return data
-        except (TypeError, ValueError):
-            # Not JSON serializable, need to use reference
-            pass
+            try:
+                # If serializable and under 10KB, return directly
+                if len(orjson.dumps(data, option=_INLINE_PROBE_OPTIONS)) < INLINE_OUTPUT_MAX_BYTES:
+                    return data
+            except TypeError:
+                # Not JSON serializable (orjson.JSONEncodeError), need to use reference
+                pass
         
         # Store as reference for large or complex objects
         return self._store_as_reference(project_id, node_id, data)
@@ -386,15 +680,27 @@ class EnhancedFlowExecutor(FlowExecutor):
     def _store_as_reference(self, project_id: str, node_id: str, data: Any) -> Dict:
         """Store an object and return a reference"""
         
-        # Initialize project store if needed
-        if project_id not in self.object_stores:
-            self.object_stores[project_id] = {}
-        
-        # Generate unique reference ID
-        ref_id = f"{node_id}_{int(time.time() * 1000)}"
-        
-        # Store the object
-        self.object_stores[project_id][ref_id] = data
+        # Generate unique reference ID; a millisecond timestamp could repeat
+        # for fast nodes and overwrite an earlier object
+        counter = self._ref_counters.setdefault(project_id, itertools.count())
+        ref_id = f"{node_id}_{next(counter)}"
+        size = _cheap_size(data)
+        
+        with self._store_lock(project_id):
+            # Initialize project store if needed
+            if project_id not in self.object_stores:
+                self.object_stores[project_id] = OrderedDict()
+                self._store_sizes[project_id] = {}
+                self._store_bytes[project_id] = 0
+            
+            # Store the object, pinned until the current run finishes
+            self.object_stores[project_id][ref_id] = data
+            self._store_sizes[project_id][ref_id] = size
+            self._store_bytes[project_id] += size
+            if project_id in self._run_refs:
+                self._run_refs[project_id].add(ref_id)
+            
+            self._evict_over_budget(project_id, keep=ref_id)
         
         # Return reference with metadata
         return {
@@ -402,13 +708,55 @@ class EnhancedFlowExecutor(FlowExecutor):
             "ref": ref_id,
             "preview": self._generate_preview(data),
             "data_type": type(data).__name__,
-            "size": sys.getsizeof(data) if hasattr(data, '__sizeof__') else None
+            "size": size
         }
     
+    def _store_lock(self, project_id: str) -> threading.Lock:
+        """Get the lock guarding a project's object store, sizes and byte total"""
+        return self._store_locks.setdefault(project_id, threading.Lock())
+    
+    def _evict_over_budget(self, project_id: str, keep: Optional[str] = None) -> None:
+        """Drop least recently used, unpinned objects until the store fits its budget"""
+        if self._store_bytes[project_id] <= self.store_budget:
+            return
+        
+        store = self.object_stores[project_id]
+        sizes = self._store_sizes[project_id]
+        pinned = self._run_refs.get(project_id, ())
+        for ref in list(store):
+            if self._store_bytes[project_id] <= self.store_budget:
+                break
+            if ref == keep or ref in pinned:
+                continue
+            del store[ref]
+            self._store_bytes[project_id] -= sizes.pop(ref)
+    
+    @contextmanager
+    def _pinned_run(self, project_id: str) -> Iterator[None]:
+        """Pin the refs a flow run creates or reads until the run ends, then evict past the budget"""
+        with self._store_lock(project_id):
+            self._active_runs[project_id] = self._active_runs.get(project_id, 0) + 1
+            self._run_refs.setdefault(project_id, set())
+        try:
+            yield
+        finally:
+            with self._store_lock(project_id):
+                self._active_runs[project_id] -= 1
+                if not self._active_runs[project_id]:
+                    del self._active_runs[project_id]
+                    self._run_refs.pop(project_id, None)
+                    if project_id in self.object_stores:
+                        self._evict_over_budget(project_id)
+    
     def _generate_preview(self, data: Any) -> str:
         """Generate a human-readable preview of the data"""
         
         try:
+            # Exact built-in containers skip the attribute probes below
+            handler = _PREVIEW_DISPATCH.get(type(data))
+            if handler is not None:
+                return handler(data)
+            
             # pandas DataFrame
             if hasattr(data, 'shape') and hasattr(data, 'columns'):
                 return f"DataFrame: {data.shape[0]} rows × {data.shape[1]} cols"
@@ -419,22 +767,15 @@ class EnhancedFlowExecutor(FlowExecutor):
             
             # List or tuple
             elif isinstance(data, (list, tuple)):
-                preview = f"{type(data).__name__} with {len(data)} items"
-                if len(data) > 0:
-                    preview += f" (first: {str(data[0])[:50]})"
-                return preview
+                return _preview_sequence(data)
             
             # Dictionary
             elif isinstance(data, dict):
-                keys = list(data.keys())[:3]
-                preview = f"Dict with {len(data)} keys"
-                if keys:
-                    preview += f" ({', '.join(str(k) for k in keys)}{'...' if len(data) > 3 else ''})"
-                return preview
+                return _preview_dict(data)
             
             # Set
             elif isinstance(data, set):
-                return f"Set with {len(data)} items"
+                return _preview_set(data)
             
             # Custom objects
             elif hasattr(data, '__class__'):
@@ -443,15 +784,16 @@ class EnhancedFlowExecutor(FlowExecutor):
                 if hasattr(data, '__len__'):
                     return f"{class_name} ({len(data)} items)"
                 elif hasattr(data, '__str__'):
-                    str_repr = str(data)[:100]
-                    return f"{class_name}: {str_repr}{'...' if len(str(data)) > 100 else ''}"
+                    str_repr = str(data)
+                    return f"{class_name}: {str_repr[:100]}{'...' if len(str_repr) > 100 else ''}"
                 else:
                     return f"{class_name} object"
             
             # Default: string representation
             else:
-                preview = str(data)[:100]
-                if len(str(data)) > 100:
+                str_repr = str(data)
+                preview = str_repr[:100]
+                if len(str_repr) > 100:
                     preview += "..."
                 return preview
                 
@@ -461,10 +803,19 @@ class EnhancedFlowExecutor(FlowExecutor):
     def cleanup_project_store(self, project_id: str):
         """Clean up object store for a project"""
         
-        if project_id in self.object_stores:
-            # Clear all references for this project
-            self.object_stores[project_id].clear()
-            del self.object_stores[project_id]
+        with self._store_lock(project_id):
+            if project_id in self.object_stores:
+                # Clear all references for this project
+                self.object_stores[project_id].clear()
+                del self.object_stores[project_id]
+                self._store_sizes.pop(project_id, None)
+                self._store_bytes.pop(project_id, None)
+    
+    def close(self):
+        """Release every project's object store"""
+        
+        for project_id in list(self.object_stores):
+            self.cleanup_project_store(project_id)
     
     def _extract_reachable_subgraph(
         self, start_id: str, nodes: Dict[str, Dict], edges: List[Dict]
@@ -518,6 +869,24 @@ class EnhancedFlowExecutor(FlowExecutor):
     ) -> Dict[str, Any]:
         """Execute the complete flow with targetHandle support"""
         
+        with self._pinned_run(project_id):
+            return await self._execute_flow(
+                project_id, start_node_id, params, result_node_values,
+                max_workers, timeout_sec, halt_on_error
+            )
+    
+    async def _execute_flow(
+        self,
+        project_id: str,
+        start_node_id: Optional[str] = None,
+        params: Optional[Dict[str, Any]] = None,
+        result_node_values: Optional[Dict[str, Any]] = None,
+        max_workers: int = 4,
+        timeout_sec: int = 30,
+        halt_on_error: bool = True,
+    ) -> Dict[str, Any]:
+        """Body of execute_flow, run while the flow's refs are pinned"""
+        
         # Load project structure
         nodes, edges = self._load_structure(project_id)
         
@@ -713,6 +1082,25 @@ class EnhancedFlowExecutor(FlowExecutor):
     ):
         """Execute flow with streaming results - yields results as nodes complete"""
         
+        with self._pinned_run(project_id):
+            async for event in self._execute_flow_streaming(
+                project_id, start_node_id, params, result_node_values,
+                max_workers, timeout_sec, halt_on_error
+            ):
+                yield event
+    
+    async def _execute_flow_streaming(
+        self,
+        project_id: str,
+        start_node_id: Optional[str] = None,
+        params: Optional[Dict[str, Any]] = None,
+        result_node_values: Optional[Dict[str, Any]] = None,
+        max_workers: int = 4,
+        timeout_sec: int = 30,
+        halt_on_error: bool = True,
+    ):
+        """Body of execute_flow_streaming, run while the flow's refs are pinned"""
+        
         # Load project structure
         nodes, edges = self._load_structure(project_id)
         
@@ -870,22 +1258,26 @@ class EnhancedFlowExecutor(FlowExecutor):
     def get_store_info(self, project_id: str) -> Dict:
         """Get information about the object store for debugging"""
         
-        if project_id not in self.object_stores:
-            return {"exists": False, "count": 0, "refs": []}
-        
-        store = self.object_stores[project_id]
-        return {
-            "exists": True,
-            "count": len(store),
-            "refs": [
-                {
-                    "ref": ref,
-                    "type": type(obj).__name__,
-                    "size": sys.getsizeof(obj) if hasattr(obj, '__sizeof__') else None
-                }
-                for ref, obj in store.items()
-            ]
-        }
+        with self._store_lock(project_id):
+            if project_id not in self.object_stores:
+                return {"exists": False, "count": 0, "refs": []}
+            
+            store = self.object_stores[project_id]
+            sizes = self._store_sizes[project_id]
+            return {
+                "exists": True,
+                "count": len(store),
+                "bytes": self._store_bytes[project_id],
+                "budget": self.store_budget,
+                "refs": [
+                    {
+                        "ref": ref,
+                        "type": type(obj).__name__,
+                        "size": sizes[ref]
+                    }
+                    for ref, obj in store.items()
+                ]
+            }
     
     def analyze_node_signature(self, project_id: str, node_id: str, node_data: Dict) -> Dict:
         """Analyze a node's RunScript function signature for metadata"""
@@ -895,12 +1287,10 @@ class EnhancedFlowExecutor(FlowExecutor):
             file_name = node_data.get("data", {}).get("file")
             if not file_name:
                 title = node_data.get("data", {}).get("title", f"Node_{node_id}")
-                sanitized_title = "".join(
-                    c if c.isalnum() or c == "_" else "_" for c in title
-                )
+                sanitized_title = _SANITIZE_RE.sub("_", title)
                 file_name = f"{node_id}_{sanitized_title}.py"
             
-            file_path = self.projects_root / project_id / file_name
+            file_path = self._project_dir(project_id) / file_name
             
             if not file_path.exists():
                 return {
@@ -910,9 +1300,8 @@ class EnhancedFlowExecutor(FlowExecutor):
                     "error": f"Node file '{file_name}' not found"
                 }
             
-            # Read and parse the node code
-            with open(file_path, 'r', encoding='utf-8') as f:
-                node_code = f.read()
+            # Read and parse the node code; ast.parse decodes the bytes itself
+            node_code = file_path.read_bytes()
             
             # Parse the AST to find RunScript function
             try:
@@ -979,7 +1368,7 @@ class EnhancedFlowExecutor(FlowExecutor):
                 "error": str(e)
             }
     
-    def _extract_function_inputs(self, func_node: ast.FunctionDef, source_code: str) -> List[Dict]:
+    def _extract_function_inputs(self, func_node: ast.FunctionDef, source_code: bytes) -> List[Dict]:
         """Extract input parameters from a function AST node"""
         
         inputs = []
@@ -1013,7 +1402,7 @@ class EnhancedFlowExecutor(FlowExecutor):
         
         return inputs
     
-    def _extract_function_outputs(self, func_node: ast.FunctionDef, source_code: str) -> List[Dict]:
+    def _extract_function_outputs(self, func_node: ast.FunctionDef, source_code: bytes) -> List[Dict]:
         """Extract output keys from return statements in function"""
         
         outputs = []
@@ -1102,4 +1491,11 @@ class EnhancedFlowExecutor(FlowExecutor):
         elif isinstance(default_node, ast.Tuple):
             return ()
         
-        return None
\ No newline at end of file
+        return None
+
+
+# Handlers for the exact container types _unwrap_input descends into
+_UNWRAP_DISPATCH = {
+    dict: EnhancedFlowExecutor._unwrap_dict,
+    list: EnhancedFlowExecutor._unwrap_list,
+}
@@ -4,7 +4,7 @@ import os
 import sys
 from typing import Optional
 
-def execute_python_code(code: str, timeout: int = 30, python_executable: Optional[str] = None, working_dir: Optional[str] = None) -> dict:
+def execute_python_code(code: str, timeout: int = 30, python_executable: Optional[str] = None, working_dir: Optional[str] = None, stdin: Optional[str] = None) -> dict:
     """
     Execute Python code in a secure temporary environment
     
@@ -13,6 +13,7 @@ def execute_python_code(code: str, timeout: int = 30, python_executable: Optiona
         timeout: Maximum execution time in seconds
         python_executable: Optional path to Python executable (for venv)
         working_dir: Optional working directory for execution
+        stdin: Optional text fed to the process on standard input
         
     Returns:
         Dictionary with output, error, and exit_code
@@ -28,6 +29,7 @@ def execute_python_code(code: str, timeout: int = 30, python_executable: Optiona
             
             result = subprocess.run(
                 [python_exe, temp_file_path],
+                input=stdin,
                 capture_output=True,
                 text=True,
                 timeout=timeout,
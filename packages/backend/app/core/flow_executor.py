@@ -6,12 +6,17 @@ Executes node-based Python code flows in isolated environments
 import asyncio
 import json
 import os
+import re
 import time
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Set, Tuple
 from collections import defaultdict, deque
 
 from .execute_code import execute_python_code
+from .project_operations import validate_project_id
+
+# Characters replaced by "_" when deriving a node file name from its title
+_SANITIZE_RE = re.compile(r"\W")
 
 
 class FlowExecutor:
@@ -20,14 +25,18 @@ class FlowExecutor:
     def __init__(self, projects_root: str):
         self.projects_root = Path(projects_root)
 
+    def _project_dir(self, project_id: str) -> Path:
+        """Get a project's directory, rejecting IDs that would resolve outside projects_root"""
+        validate_project_id(project_id)
+        return self.projects_root / project_id
+
     def _load_structure(self, project_id: str) -> Tuple[Dict[str, Dict], List[Dict]]:
         """Load project structure from JSON file"""
-        structure_file = self.projects_root / project_id / "structure.json"
+        structure_file = self._project_dir(project_id) / "structure.json"
         if not structure_file.exists():
             raise FileNotFoundError(f"Project {project_id} not found")
 
-        with open(structure_file, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        data = json.loads(structure_file.read_bytes())
 
         # Convert nodes list to dict for easier access
         nodes = {node["id"]: node for node in data.get("nodes", [])}
@@ -147,12 +156,10 @@ class FlowExecutor:
         if not file_name:
             # Generate default file name for custom nodes
             title = node_data.get("data", {}).get("title", f"Node_{node_id}")
-            sanitized_title = "".join(
-                c if c.isalnum() or c == "_" else "_" for c in title
-            )
+            sanitized_title = _SANITIZE_RE.sub("_", title)
             file_name = f"{node_id}_{sanitized_title}.py"
 
-        file_path = self.projects_root / project_id / file_name
+        file_path = self._project_dir(project_id) / file_name
 
         if not file_path.exists():
             # Log more details for debugging
@@ -262,7 +269,7 @@ except Exception as e:
         # Execute with system Python environment
         start_time = time.time()
         python_exe = None  # Use system Python
-        project_dir = str(self.projects_root / project_id)
+        project_dir = str(self._project_dir(project_id))
         execution_result = execute_python_code(
             wrapper_code, timeout, python_exe, project_dir
         )
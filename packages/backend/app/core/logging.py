@@ -4,7 +4,7 @@ Structured logging for LSP and application
 
 import logging
 import os
-import json
+import orjson
 import time
 import pathlib
 from collections import deque
@@ -12,6 +12,8 @@ from typing import Literal, Optional, Dict, Any
 from datetime import datetime
 
 LOG_LEVEL = os.getenv("LSP_LOG_LEVEL", "INFO").upper()
+# Per-frame and stdio debug records are only collected at DEBUG/TRACE level
+DEBUG_ENABLED = LOG_LEVEL in ("DEBUG", "TRACE")
 # Use local directory for logs instead of system directory
 STDIO_DIR = pathlib.Path(os.getenv("LSP_STDIO_LOG_DIR", 
     str(pathlib.Path(__file__).parent.parent.parent / "logs" / "lsp")))
@@ -45,7 +47,7 @@ class _JsonFormatter(logging.Formatter):
         if hasattr(record, 'extra') and isinstance(record.extra, dict):
             base.update(record.extra)
         
-        return json.dumps(base, ensure_ascii=False)
+        return orjson.dumps(base).decode()
 
 def lsp_stdio_logger(
     project_id: str, 
@@ -61,10 +63,10 @@ def lsp_stdio_logger(
             timestamp = datetime.now().isoformat()
             f.write(f"[{timestamp}] {line}\n")
     except Exception as e:
-        get_logger("lsp.stdio").error(f"Failed to write stdio log: {e}")
+        get_logger("lsp.stdio").error("Failed to write stdio log: %s", e)
     
     # Sample structured log (avoid flooding)
-    if LOG_LEVEL in ["DEBUG", "TRACE"]:
+    if DEBUG_ENABLED:
         get_logger("lsp.stdio").debug(
             "stdio",
             extra={
@@ -81,10 +83,13 @@ def log_lsp_frame(
     project_id: str,
     payload: bytes
 ) -> None:
-    """Log LSP JSON-RPC frames for debugging"""
+    """Log LSP JSON-RPC frames for debugging (no-op below DEBUG level)"""
+    if not DEBUG_ENABLED:
+        return
+    
     try:
         # Parse JSON-RPC payload
-        obj = json.loads(payload.decode("utf-8"))
+        obj = orjson.loads(payload)
         method = obj.get("method")
         msg_id = obj.get("id")
         size = len(payload)
@@ -111,11 +116,11 @@ def log_lsp_frame(
         if LOG_LEVEL == "TRACE":
             logger.debug("payload", extra={**record, "payload": obj})
             
-    except json.JSONDecodeError:
+    except orjson.JSONDecodeError:
         # Not JSON, might be binary or malformed
         pass
     except Exception as e:
-        get_logger("lsp.frame").error(f"Error logging LSP frame: {e}")
+        get_logger("lsp.frame").error("Error logging LSP frame: %s", e)
 
 def log_lsp_lifecycle(
     event: str,
@@ -159,5 +164,5 @@ def get_stdio_logs(
             all_lines = f.readlines()
             return all_lines[-lines:]
     except Exception as e:
-        get_logger("lsp.stdio").error(f"Failed to read stdio log: {e}")
+        get_logger("lsp.stdio").error("Failed to read stdio log: %s", e)
         return []
\ No newline at end of file
@@ -1,34 +1,60 @@
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
+from .project_operations import get_project_path
+from .project_structure import (
+    after_structure_save,
+    get_project_structure,
+    get_project_structure_for_update,
+    save_project_structure,
+    structure_lock
+)
+from .structure_normalize import normalize_node
+
+# Most node source files kept in memory
+NODE_CODE_CACHE_SIZE = 256
+
+# Node source files, LRU ordered: {(project_id, file_name): (mtime_ns, size, code)}
+_node_code_cache: "OrderedDict[Tuple[str, str], Tuple[int, int, str]]" = OrderedDict()
+_node_code_cache_lock = threading.Lock()
+
+def _drop_cached_code(project_id: str, file_name: str) -> None:
+    with _node_code_cache_lock:
+        _node_code_cache.pop((project_id, file_name), None)
+
+def invalidate_project_code(project_id: str) -> None:
+    """Drop every cached node source file of a project"""
+    with _node_code_cache_lock:
+        for key in [key for key in _node_code_cache if key[0] == project_id]:
+            del _node_code_cache[key]
 
 def create_node(project_id: str, node_id: str, node_type: str, position: Dict[str, float], 
                 data: Dict[str, Any]) -> Dict[str, Any]:
     """Create a new node and corresponding python file matching React Flow structure"""
-    from .project_operations import get_project_path
-    from .project_structure import get_project_structure, save_project_structure
-    
-    project_path = get_project_path(project_id)
-    
-    # Update project json first to check for existing nodes
-    structure = get_project_structure(project_id)
-    
-    # Check if node already exists
-    if any(node['id'] == node_id for node in structure['nodes']):
-        raise ValueError(f"Node with ID '{node_id}' already exists")
-    
-    # Extract title from data for filename
-    node_title = data.get('title', f'node_{node_id}')
-    
-    # Only create Python file for custom nodes
-    # Start and Result nodes don't need code files
-    py_filename = None
-    if node_type == 'custom':
-        # Create python file for the node
-        py_filename = f"{node_id}_{node_title}.py".replace(" ", "_").replace("/", "__")
-        py_filepath = project_path / py_filename
+    with structure_lock(project_id):
+        project_path = get_project_path(project_id)
+        
+        # Update project json first to check for existing nodes
+        structure = get_project_structure_for_update(project_id)
+        
+        # Check if node already exists
+        if any(node['id'] == node_id for node in structure['nodes']):
+            raise ValueError(f"Node with ID '{node_id}' already exists")
+        
+        # Extract title from data for filename
+        node_title = data.get('title', f'node_{node_id}')
         
-        # Create empty python file with basic template
-        initial_code = f"""# Node: {node_title}
+        # Only create Python file for custom nodes
+        # Start and Result nodes don't need code files
+        py_filename = None
+        if node_type == 'custom':
+            # Create python file for the node
+            py_filename = f"{node_id}_{node_title}.py".replace(" ", "_").replace("/", "__")
+            py_filepath = project_path / py_filename
+            
+            # Create empty python file with basic template
+            initial_code = f"""# Node: {node_title}
 # ID: {node_id}
 
 def main(input_data=None):
@@ -46,86 +72,89 @@ def main(input_data=None):
         return input_data
     return None
 """
-        with open(py_filepath, 'w') as f:
-            f.write(initial_code)
-    # Start and Result nodes don't need any Python file
-    
-    # Add new node with React Flow structure
-    # Ensure data has required fields
-    node_data = {
-        "title": data.get('title', f'Node {node_id}'),
-        "description": data.get('description', ''),
-        **data  # Include any additional data fields
-    }
-    
-    # Only add file reference if a file was created
-    if py_filename:
-        node_data["file"] = py_filename
-    
-    new_node = {
-        "id": node_id,
-        "type": node_type,
-        "position": position,
-        "data": node_data
-    }
-    structure['nodes'].append(new_node)
-    
-    save_project_structure(project_id, structure)
-    
-    return {
-        "success": True,
-        "message": f"Node '{node_title}' created successfully",
-        "node": new_node
-    }
+            with open(py_filepath, 'w') as f:
+                f.write(initial_code)
+        # Start and Result nodes don't need any Python file
+        
+        # Add new node with React Flow structure
+        # Ensure data has required fields
+        node_data = {
+            "title": data.get('title', f'Node {node_id}'),
+            "description": data.get('description', ''),
+            **data  # Include any additional data fields
+        }
+        
+        # Only add file reference if a file was created
+        if py_filename:
+            node_data["file"] = py_filename
+        
+        new_node = normalize_node({
+            "id": node_id,
+            "type": node_type,
+            "position": position,
+            "data": node_data
+        })
+        structure['nodes'].append(new_node)
+        
+        save_project_structure(project_id, structure)
+        
+        return {
+            "success": True,
+            "message": f"Node '{node_title}' created successfully",
+            "node": new_node
+        }
 
 def delete_node(project_id: str, node_id: str) -> Dict[str, Any]:
     """Delete a node and its corresponding python file"""
-    from .project_operations import get_project_path
-    from .project_structure import get_project_structure, save_project_structure
-    
-    project_path = get_project_path(project_id)
-    
-    # Get project structure
+    with structure_lock(project_id):
+        # Get project structure
+        structure = get_project_structure_for_update(project_id)
+        
+        # Find node to delete
+        node_to_delete = None
+        for node in structure['nodes']:
+            if node['id'] == node_id:
+                node_to_delete = node
+                break
+        
+        if not node_to_delete:
+            raise ValueError(f"Node with ID '{node_id}' not found")
+        
+        # Remove node from structure
+        structure['nodes'] = [n for n in structure['nodes'] if n['id'] != node_id]
+        
+        # Remove any edges connected to this node
+        structure['edges'] = [
+            e for e in structure['edges'] 
+            if e.get('source') != node_id and e.get('target') != node_id
+        ]
+        
+        save_project_structure(project_id, structure)
+        
+        # Delete python file (file reference is now in data) only once the
+        # structure without the node has been saved
+        file_name = node_to_delete.get('data', {}).get('file')
+        if file_name:
+            after_structure_save(project_id, lambda: _remove_node_file(project_id, file_name))
+        
+        return {
+            "success": True,
+            "message": f"Node '{node_id}' deleted successfully"
+        }
+
+def _remove_node_file(project_id: str, file_name: str) -> None:
+    """Delete a node's python file unless a node in the saved structure still uses it"""
     structure = get_project_structure(project_id)
+    if any(node.get('data', {}).get('file') == file_name for node in structure['nodes']):
+        return
     
-    # Find node to delete
-    node_to_delete = None
-    for node in structure['nodes']:
-        if node['id'] == node_id:
-            node_to_delete = node
-            break
-    
-    if not node_to_delete:
-        raise ValueError(f"Node with ID '{node_id}' not found")
-    
-    # Delete python file (file reference is now in data)
-    file_name = node_to_delete.get('data', {}).get('file')
-    if file_name:
-        py_filepath = project_path / file_name
-        if py_filepath.exists():
-            py_filepath.unlink()
-    
-    # Remove node from structure
-    structure['nodes'] = [n for n in structure['nodes'] if n['id'] != node_id]
-    
-    # Remove any edges connected to this node
-    structure['edges'] = [
-        e for e in structure['edges'] 
-        if e.get('source') != node_id and e.get('target') != node_id
-    ]
-    
-    save_project_structure(project_id, structure)
-    
-    return {
-        "success": True,
-        "message": f"Node '{node_id}' deleted successfully"
-    }
+    py_filepath = get_project_path(project_id) / file_name
+    _drop_cached_code(project_id, file_name)
+    if py_filepath.exists():
+        py_filepath.unlink()
 
 def get_node_code(project_id: str, node_id: str) -> str:
     """Get the code content of a node's python file"""
-    from .project_operations import get_project_path
-    from .project_structure import get_project_structure
-    
     project_path = get_project_path(project_id)
     structure = get_project_structure(project_id)
     
@@ -145,16 +174,30 @@ def get_node_code(project_id: str, node_id: str) -> str:
         return ""
     
     py_filepath = project_path / file_name
-    if not py_filepath.exists():
+    try:
+        stat = py_filepath.stat()
+    except FileNotFoundError:
         return ""
     
+    # Serve unchanged files from memory
+    cache_key = (project_id, file_name)
+    with _node_code_cache_lock:
+        cached = _node_code_cache.get(cache_key)
+        if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            _node_code_cache.move_to_end(cache_key)
+            return cached[2]
+    
     with open(py_filepath, 'r') as f:
-        return f.read()
+        code = f.read()
+    with _node_code_cache_lock:
+        _node_code_cache[cache_key] = (stat.st_mtime_ns, stat.st_size, code)
+        _node_code_cache.move_to_end(cache_key)
+        if len(_node_code_cache) > NODE_CODE_CACHE_SIZE:
+            _node_code_cache.popitem(last=False)
+    return code
 
 def save_node_code(project_id: str, node_id: str, code: str) -> Dict[str, Any]:
     """Save code to a node's python file with automatic variable renaming"""
-    from .project_operations import get_project_path
-    from .project_structure import get_project_structure
     import ast
     import re
     
@@ -178,11 +221,10 @@ def save_node_code(project_id: str, node_id: str, code: str) -> Dict[str, Any]:
     
     py_filepath = project_path / file_name
     
-    # Get the old code to compare parameters
-    old_code = ""
+    # Get the old code to compare parameters (only parsed, so kept as bytes)
+    old_code = b""
     if py_filepath.exists():
-        with open(py_filepath, 'r') as f:
-            old_code = f.read()
+        old_code = py_filepath.read_bytes()
     
     # Parse and compare function parameters
     try:
@@ -222,6 +264,7 @@ def save_node_code(project_id: str, node_id: str, code: str) -> Dict[str, Any]:
         print(f"Warning: Could not parse code for automatic variable renaming: {e}")
     
     # Write the updated code
+    _drop_cached_code(project_id, file_name)
     with open(py_filepath, 'w') as f:
         f.write(code)
     
@@ -233,28 +276,28 @@ def save_node_code(project_id: str, node_id: str, code: str) -> Dict[str, Any]:
 
 def update_node_position(project_id: str, node_id: str, position: Dict[str, float]) -> Dict[str, Any]:
     """Update node position in project structure"""
-    from .project_structure import get_project_structure, save_project_structure
-    
-    # Get current structure
-    structure = get_project_structure(project_id)
-    
-    # Find and update node position
-    node_found = False
-    for node in structure['nodes']:
-        if node['id'] == node_id:
-            node['position'] = position
-            node_found = True
-            break
-    
-    if not node_found:
-        raise ValueError(f"Node with ID '{node_id}' not found")
-    
-    # Save updated structure
-    save_project_structure(project_id, structure)
-    
-    return {
-        "success": True,
-        "message": f"Position updated for node '{node_id}'",
-        "node_id": node_id,
-        "position": position
-    }
\ No newline at end of file
+    with structure_lock(project_id):
+        # Get current structure
+        structure = get_project_structure_for_update(project_id)
+        
+        # Find and update node position
+        node_found = False
+        for node in structure['nodes']:
+            if node['id'] == node_id:
+                node['position'] = position
+                normalize_node(node)
+                node_found = True
+                break
+        
+        if not node_found:
+            raise ValueError(f"Node with ID '{node_id}' not found")
+        
+        # Save updated structure
+        save_project_structure(project_id, structure)
+        
+        return {
+            "success": True,
+            "message": f"Position updated for node '{node_id}'",
+            "node_id": node_id,
+            "position": position
+        }
\ No newline at end of file
@@ -1,6 +1,7 @@
 import json
 import shutil
 import os
+import re
 from pathlib import Path
 from typing import List, Dict, Any
 from .projects_registry import (
@@ -12,6 +13,15 @@ from .projects_registry import (
 # Get absolute path to projects directory
 PROJECTS_BASE_PATH = Path(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))) / "projects"
 
+# Allowed project IDs (UUIDs and generated "project-..." IDs); also keeps
+# IDs like "../x" from resolving outside the projects directory
+PROJECT_ID_RE = re.compile(r"\A[A-Za-z0-9_-]{1,64}\Z")
+
+def validate_project_id(project_id: str) -> None:
+    """Raise ValueError if project_id is not a safe directory name"""
+    if not PROJECT_ID_RE.match(project_id):
+        raise ValueError(f"Invalid project ID '{project_id}'")
+
 def ensure_projects_dir() -> None:
     """Ensure the projects directory exists"""
     PROJECTS_BASE_PATH.mkdir(exist_ok=True)
@@ -23,6 +33,7 @@ def get_all_projects() -> List[Dict[str, str]]:
 
 def create_project(project_name: str, project_description: str, project_id: str) -> Dict[str, Any]:
     """Create a new project folder and json file"""
+    validate_project_id(project_id)
     ensure_projects_dir()
     project_path = PROJECTS_BASE_PATH / project_id
     
@@ -59,6 +70,7 @@ def create_project(project_name: str, project_description: str, project_id: str)
 
 def delete_project(project_name: str, project_id:str) -> Dict[str, Any]:
     """Delete entire project folder including venv and remove from registry"""
+    validate_project_id(project_id)
     ensure_projects_dir()
     project_path = PROJECTS_BASE_PATH / project_id
     
@@ -83,6 +95,7 @@ def delete_project(project_name: str, project_id:str) -> Dict[str, Any]:
 
 def get_project_path(project_id: str) -> Path:
     """Get the path to a project directory using project_id"""
+    validate_project_id(project_id)
     ensure_projects_dir()
     project_path = PROJECTS_BASE_PATH / project_id
     
@@ -1,26 +1,238 @@
-import json
+import os
+import tempfile
+import threading
+import orjson
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, Any
+from typing import Callable, Dict, Any, Iterator, List, Optional, Set, Tuple
+from .logging import get_logger
+from .structure_normalize import normalize_for_reactflow
+
+try:
+    import fcntl
+except ImportError:  # Windows: only in-process locking is available
+    fcntl = None
+
+logger = get_logger(__name__)
+
+# Parsed structure.json per project: {project_id: ((ino, mtime_ns, size), structure)}
+_structure_cache: Dict[str, Tuple[Tuple[int, int, int], Dict[str, Any]]] = {}
+
+# In-process locks per project; flock on top of them serializes other workers
+_structure_locks: Dict[str, threading.Lock] = {}
+
+# Per-thread state: projects whose lock is held, and saves deferred by structure_batch
+_thread_state = threading.local()
+
+def _held_locks() -> Set[str]:
+    if not hasattr(_thread_state, "held"):
+        _thread_state.held = set()
+    return _thread_state.held
+
+def _pending_saves() -> Dict[str, Optional[Dict[str, Any]]]:
+    if not hasattr(_thread_state, "pending"):
+        _thread_state.pending = {}
+    return _thread_state.pending
+
+def _after_save_callbacks() -> Dict[str, List[Callable[[], None]]]:
+    if not hasattr(_thread_state, "after_save"):
+        _thread_state.after_save = {}
+    return _thread_state.after_save
+
+def _file_signature(path: Path) -> Tuple[int, int, int]:
+    """Get the (ino, mtime_ns, size) triple used to validate cache entries"""
+    stat = path.stat()
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+@contextmanager
+def structure_lock(project_id: str) -> Iterator[None]:
+    """
+    Hold an exclusive lock on a project's structure for a read-modify-write
+    
+    Re-entering the lock for the same project on the same thread is a no-op.
+    """
+    from .project_operations import get_project_path
+    
+    held = _held_locks()
+    if project_id in held:
+        yield
+        return
+    
+    lock_path = get_project_path(project_id) / ".structure.lock"
+    with _structure_locks.setdefault(project_id, threading.Lock()):
+        with open(lock_path, 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            held.add(project_id)
+            try:
+                yield
+            finally:
+                held.discard(project_id)
+
+@contextmanager
+def structure_batch(project_id: str) -> Iterator[None]:
+    """
+    Hold the structure lock and defer saves until the block ends
+    
+    Mutations made inside the block are written to structure.json once, on
+    exit. If the block raises, they are discarded.
+    """
+    pending = _pending_saves()
+    with structure_lock(project_id):
+        if project_id in pending:
+            yield
+            return
+        
+        pending[project_id] = None
+        callbacks = _after_save_callbacks()
+        try:
+            yield
+        except BaseException:
+            pending.pop(project_id, None)
+            callbacks.pop(project_id, None)
+            raise
+        
+        structure = pending.pop(project_id)
+        try:
+            if structure is not None:
+                save_project_structure(project_id, structure)
+        except BaseException:
+            callbacks.pop(project_id, None)
+            raise
+        
+        for callback in callbacks.pop(project_id, []):
+            callback()
+
+def after_structure_save(project_id: str, callback: Callable[[], None]) -> None:
+    """
+    Run a side effect once the project's structure changes are on disk
+    
+    Inside structure_batch the callback waits for the batch to be saved and
+    is dropped if the batch fails; otherwise it runs immediately.
+    """
+    if project_id in _pending_saves():
+        _after_save_callbacks().setdefault(project_id, []).append(callback)
+    else:
+        callback()
+
+def get_structure_signature(project_id: str) -> Tuple[int, int, int]:
+    """Get a key that changes whenever the project's structure.json is rewritten"""
+    from .project_operations import get_project_path
+    
+    try:
+        return _file_signature(get_project_path(project_id) / "structure.json")
+    except FileNotFoundError:
+        raise ValueError(f"Project structure file for project ID '{project_id}' does not exist")
+
+def invalidate_project_structure(project_id: str) -> None:
+    """Drop the cached structure of a project"""
+    _structure_cache.pop(project_id, None)
 
 def get_project_structure(project_id: str) -> Dict[str, Any]:
-    """Get the node-edge structure from project json using project_id"""
+    """
+    Get the node-edge structure from project json using project_id
+    
+    Structures are normalized for ReactFlow when nodes and edges are
+    written (and once at startup), so the file is returned as stored. The
+    parsed dict is cached until the file changes on disk and is shared, so
+    it must not be modified; use get_project_structure_for_update instead.
+    """
     from .project_operations import get_project_path
     
     project_path = get_project_path(project_id)
     project_json_path = project_path / "structure.json"
     
-    if not project_json_path.exists():
+    try:
+        signature = _file_signature(project_json_path)
+    except FileNotFoundError:
+        invalidate_project_structure(project_id)
         raise ValueError(f"Project structure file for project ID '{project_id}' does not exist")
     
-    with open(project_json_path, 'r') as f:
-        return json.load(f)
+    cached = _structure_cache.get(project_id)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    
+    structure = orjson.loads(project_json_path.read_bytes())
+    _structure_cache[project_id] = (signature, structure)
+    return structure
+
+async def get_project_structure_async(project_id: str) -> Dict[str, Any]:
+    """Like get_project_structure, but read structure.json without blocking the event loop"""
+    import aiofiles
+    from .project_operations import get_project_path
+    
+    project_json_path = get_project_path(project_id) / "structure.json"
+    signature = get_structure_signature(project_id)
+    
+    cached = _structure_cache.get(project_id)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    
+    async with aiofiles.open(project_json_path, 'rb') as f:
+        data = await f.read()
+    structure = orjson.loads(data)
+    _structure_cache[project_id] = (signature, structure)
+    return structure
+
+def get_project_structure_for_update(project_id: str) -> Dict[str, Any]:
+    """
+    Get a private copy of the structure to modify under structure_lock
+    
+    Inside structure_batch this is the batch's pending structure, so later
+    operations see earlier ones. The cache only picks up the copy once
+    save_project_structure has written it to disk.
+    """
+    pending = _pending_saves().get(project_id)
+    if pending is not None:
+        return pending
+    return orjson.loads(orjson.dumps(get_project_structure(project_id)))
 
 def save_project_structure(project_id: str, structure: Dict[str, Any]) -> None:
     """Save the node-edge structure to project json using project_id"""
     from .project_operations import get_project_path
     
+    # Inside structure_batch, only remember the structure to write on exit
+    pending = _pending_saves()
+    if project_id in pending:
+        pending[project_id] = structure
+        return
+    
     project_path = get_project_path(project_id)
     project_json_path = project_path / "structure.json"
     
-    with open(project_json_path, 'w') as f:
-        json.dump(structure, f, indent=2)
+    # Write to a temp file and swap it in so readers never see a partial file
+    try:
+        fd, temp_path = tempfile.mkstemp(dir=project_path, prefix=".structure.", suffix=".tmp")
+        try:
+            os.fchmod(fd, 0o644)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(orjson.dumps(structure, option=orjson.OPT_INDENT_2))
+            os.replace(temp_path, project_json_path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+    except BaseException:
+        invalidate_project_structure(project_id)
+        raise
+    
+    _structure_cache[project_id] = (_file_signature(project_json_path), structure)
+
+
+def normalize_project_structures() -> int:
+    """Normalize every project's structure.json for ReactFlow, rewriting only files that change"""
+    from .project_operations import PROJECTS_BASE_PATH
+    
+    rewritten = 0
+    for project_json_path in PROJECTS_BASE_PATH.glob("*/structure.json"):
+        project_id = project_json_path.parent.name
+        try:
+            with structure_lock(project_id):
+                structure = orjson.loads(project_json_path.read_bytes())
+                before = orjson.dumps(structure)
+                if orjson.dumps(normalize_for_reactflow(structure)) != before:
+                    save_project_structure(project_id, structure)
+                    rewritten += 1
+        except (ValueError, OSError) as e:
+            logger.warning("Skipping structure normalization for %s: %s", project_id, e)
+    
+    return rewritten
@@ -1,78 +1,125 @@
 import json
 import os
+import tempfile
+import threading
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 
 # Get absolute path to projects directory
 PROJECTS_BASE_PATH = Path(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))) / "projects"
 PROJECTS_REGISTRY_FILE = PROJECTS_BASE_PATH / "projects.json"
 
+# Parsed registry, reused until the file changes: ((path, ino, mtime_ns, size), registry)
+_registry_cache: Optional[Tuple[Tuple[str, int, int, int], Dict[str, Any]]] = None
+
+# Serializes registry read-modify-writes across request threads
+_registry_lock = threading.RLock()
+
+def _registry_signature() -> Tuple[str, int, int, int]:
+    stat = PROJECTS_REGISTRY_FILE.stat()
+    return str(PROJECTS_REGISTRY_FILE), stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+def _write_registry(registry: Dict[str, Any]) -> None:
+    """Write projects.json through a temp file so readers never see a partial file"""
+    fd, temp_path = tempfile.mkstemp(dir=PROJECTS_BASE_PATH, prefix=".projects.", suffix=".tmp")
+    try:
+        os.fchmod(fd, 0o644)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(registry, f, indent=2)
+        os.replace(temp_path, PROJECTS_REGISTRY_FILE)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
 def ensure_projects_registry() -> None:
     """Ensure the projects.json file exists with proper structure"""
     PROJECTS_BASE_PATH.mkdir(exist_ok=True)
     
-    if not PROJECTS_REGISTRY_FILE.exists():
-        initial_registry = {
-            "projects": []
-        }
-        with open(PROJECTS_REGISTRY_FILE, 'w') as f:
-            json.dump(initial_registry, f, indent=2)
+    with _registry_lock:
+        if not PROJECTS_REGISTRY_FILE.exists():
+            initial_registry = {
+                "projects": []
+            }
+            _write_registry(initial_registry)
 
 def get_projects_registry() -> Dict[str, Any]:
-    """Get the entire projects registry"""
+    """
+    Get the entire projects registry
+    
+    The parsed registry is cached until projects.json changes on disk, so
+    the returned dict is shared and must not be modified in place: build a
+    new registry and save it instead.
+    """
+    global _registry_cache
     ensure_projects_registry()
     
-    try:
-        with open(PROJECTS_REGISTRY_FILE, 'r') as f:
-            content = f.read()
-            if not content:
-                return {"projects": []}
-            return json.loads(content)
-    except (json.JSONDecodeError, IOError) as e:
-        print(f"Error reading projects registry: {e}")
-        # Return empty registry if file is corrupted
-        return {"projects": []}
+    with _registry_lock:
+        try:
+            signature = _registry_signature()
+            if _registry_cache is not None and _registry_cache[0] == signature:
+                return _registry_cache[1]
+            
+            with open(PROJECTS_REGISTRY_FILE, 'r') as f:
+                content = f.read()
+                if not content:
+                    return {"projects": []}
+                registry = json.loads(content)
+            _registry_cache = (signature, registry)
+            return registry
+        except (json.JSONDecodeError, IOError) as e:
+            print(f"Error reading projects registry: {e}")
+            # Return empty registry if file is corrupted
+            return {"projects": []}
 
 def save_projects_registry(registry: Dict[str, Any]) -> None:
     """Save the projects registry"""
+    global _registry_cache
     ensure_projects_registry()
     
-    with open(PROJECTS_REGISTRY_FILE, 'w') as f:
-        json.dump(registry, f, indent=2)
+    with _registry_lock:
+        try:
+            _write_registry(registry)
+        except BaseException:
+            _registry_cache = None
+            raise
+        
+        # Refresh the cache here too, in case the rewrite kept mtime and size
+        _registry_cache = (_registry_signature(), registry)
 
 def add_project_to_registry(project_name: str, project_description: str, project_id:str) -> None:
     """Add a project to the registry"""
-    registry = get_projects_registry()
-    
-    # Check if project already exists
-    for project in registry["projects"]:
-        if project["project_name"] == project_name:
-            raise ValueError(f"Project '{project_name}' already exists in registry")
-    
-    # Add new project
-    registry["projects"].append({
-        "project_name": project_name,
-        "project_description": project_description,
-        "project_id": project_id
-    })
-    
-    save_projects_registry(registry)
+    with _registry_lock:
+        registry = get_projects_registry()
+        
+        # Check if project already exists
+        for project in registry["projects"]:
+            if project["project_name"] == project_name:
+                raise ValueError(f"Project '{project_name}' already exists in registry")
+        
+        # Add new project to a copy; the cached registry stays untouched until saved
+        projects = registry["projects"] + [{
+            "project_name": project_name,
+            "project_description": project_description,
+            "project_id": project_id
+        }]
+        
+        save_projects_registry({**registry, "projects": projects})
 
 def remove_project_from_registry(project_name: str, project_id: str) -> None:
     """Remove a project from the registry using project_id"""
-    registry = get_projects_registry()
-    
-    # Find and remove project by project_id
-    original_length = len(registry["projects"])
-    registry["projects"] = [
-        p for p in registry["projects"] 
-        if p["project_id"] != project_id
-    ]
-    
-    if len(registry["projects"]) == original_length:
-        raise ValueError(f"Project with ID '{project_id}' not found in registry")
-    
-    save_projects_registry(registry)
+    with _registry_lock:
+        registry = get_projects_registry()
+        
+        # Find and remove project by project_id
+        projects = [
+            p for p in registry["projects"] 
+            if p["project_id"] != project_id
+        ]
+        
+        if len(projects) == len(registry["projects"]):
+            raise ValueError(f"Project with ID '{project_id}' not found in registry")
+        
+        save_projects_registry({**registry, "projects": projects})
 
 # def update_project_in_registry(project_name: str, project_description: str) -> None:
 #     """Update a project's description in the registry"""
@@ -0,0 +1,59 @@
+"""
+Structure Normalization Module
+Fills in the fields ReactFlow expects on nodes and edges of a project structure
+"""
+
+from typing import Dict, Any
+
+# Accepted markerEnd types (matched case-insensitively); anything else falls back to arrowclosed
+MARKER_MAP = {"arrow": "arrow", "arrowclosed": "arrowclosed"}
+
+def normalize_node(node: Dict[str, Any]) -> Dict[str, Any]:
+    """Add default values for missing node fields in place and return the node"""
+    # Ensure node has required fields
+    data = node.setdefault("data", {})
+    if "title" not in data:
+        data["title"] = f"Node {node.get('id', 'unknown')}"
+    data.setdefault("description", "")
+    
+    # Ensure position exists with default values
+    position = node.get("position")
+    if isinstance(position, dict):
+        position.setdefault("x", 100)
+        position.setdefault("y", 100)
+    else:
+        node["position"] = {"x": 100, "y": 100}
+    
+    return node
+
+def normalize_edge(edge: Dict[str, Any]) -> Dict[str, Any]:
+    """Add default values for missing edge fields in place and return the edge"""
+    # Leave edges without endpoints untouched
+    if "source" not in edge or "target" not in edge:
+        return edge
+    
+    # Add optional fields with null as default
+    edge.setdefault("sourceHandle", None)
+    edge.setdefault("targetHandle", None)
+    
+    # Ensure markerEnd has a type ReactFlow understands
+    marker = edge.get("markerEnd")
+    if marker is None and "markerEnd" not in edge:
+        edge["markerEnd"] = {"type": "arrowclosed"}
+    elif isinstance(marker, dict):
+        marker_type = marker.get("type", "arrowclosed")
+        if isinstance(marker_type, str):
+            # Stored types are usually lowercase already; only lower() on a miss
+            marker["type"] = MARKER_MAP.get(marker_type) or MARKER_MAP.get(marker_type.lower(), "arrowclosed")
+    
+    return edge
+
+def normalize_for_reactflow(structure: Dict[str, Any]) -> Dict[str, Any]:
+    """Add default values for missing node/edge fields in place and return the structure"""
+    for node in structure.get("nodes", []):
+        normalize_node(node)
+    
+    for edge in structure.get("edges", []):
+        normalize_edge(edge)
+    
+    return structure
@@ -0,0 +1,265 @@
+"""
+Worker Pool Module
+Keeps warm Python worker processes per project for single-node execution
+
+Workers keep modules imported by earlier runs, so heavy libraries stay
+warm. Modules loaded from the project directory itself are dropped after
+every run, so edits to a project's helper modules apply to the next run.
+"""
+
+import asyncio
+import json
+import struct
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+# Script run by each worker: read a length-prefixed request (code, then stdin
+# bytes), exec the code with fresh globals and redirected stdio, and reply
+# with a length-prefixed JSON result. Modules the run imported from the
+# project directory are evicted afterwards.
+# The protocol streams are moved off fds 0/1 so node code cannot corrupt them.
+_WORKER_SOURCE = r'''
+import importlib
+import io
+import json
+import os
+import struct
+import sys
+import traceback
+
+_proto_in = os.fdopen(os.dup(0), "rb")
+_proto_out = os.fdopen(os.dup(1), "wb")
+os.dup2(os.open(os.devnull, os.O_RDONLY), 0)
+os.dup2(2, 1)
+_cwd = os.getcwd()
+_project_prefix = os.path.join(_cwd, "")
+
+while True:
+    header = _proto_in.read(8)
+    if len(header) < 8:
+        break
+    code_len, stdin_len = struct.unpack(">II", header)
+    code = _proto_in.read(code_len).decode()
+    stdin = _proto_in.read(stdin_len).decode()
+
+    out, err = io.StringIO(), io.StringIO()
+    sys.stdin, sys.stdout, sys.stderr = io.StringIO(stdin), out, err
+    exit_code = 0
+    loaded = set(sys.modules)
+    try:
+        os.chdir(_cwd)
+        importlib.invalidate_caches()
+        exec(compile(code, "<node>", "exec"), {"__name__": "__main__"})
+    except SystemExit as e:
+        if isinstance(e.code, int) or e.code is None:
+            exit_code = e.code or 0
+        else:
+            err.write(f"{e.code}\n")
+            exit_code = 1
+    except BaseException:
+        traceback.print_exc()
+        exit_code = 1
+    finally:
+        sys.stdin, sys.stdout, sys.stderr = sys.__stdin__, sys.__stdout__, sys.__stderr__
+        for name in set(sys.modules) - loaded:
+            path = getattr(sys.modules[name], "__file__", None)
+            if path and os.path.abspath(path).startswith(_project_prefix):
+                del sys.modules[name]
+
+    reply = json.dumps({
+        "output": out.getvalue(),
+        "error": err.getvalue() or None,
+        "exit_code": exit_code,
+    }).encode()
+    _proto_out.write(struct.pack(">I", len(reply)) + reply)
+    _proto_out.flush()
+'''
+
+
+class _Worker:
+    """A running worker process and its usage counters"""
+
+    def __init__(self, proc: asyncio.subprocess.Process, generation: int):
+        self.proc = proc
+        self.generation = generation
+        self.uses = 0
+        self.started = time.monotonic()
+        self.idle_since = 0.0
+        # Timer that retires the worker if it stays idle
+        self.reaper: Optional[asyncio.TimerHandle] = None
+
+
+class WorkerPool:
+    """Pool of long-lived Python workers, keyed by project_id"""
+
+    def __init__(
+        self,
+        max_workers_per_project: int = 2,
+        max_uses: int = 100,
+        max_age_sec: float = 600.0,
+        idle_timeout_sec: float = 120.0,
+        max_idle_workers: int = 8,
+    ):
+        self.max_workers_per_project = max_workers_per_project
+        self.max_uses = max_uses
+        self.max_age_sec = max_age_sec
+        self.idle_timeout_sec = idle_timeout_sec
+        self.max_idle_workers = max_idle_workers
+        self._idle: Dict[str, List[_Worker]] = {}
+        self._slots: Dict[str, asyncio.Semaphore] = {}
+        self._generations: Dict[str, int] = {}
+
+    async def execute(
+        self,
+        project_id: str,
+        code: str,
+        timeout: int = 30,
+        working_dir: Optional[str] = None,
+        python_executable: Optional[str] = None,
+        stdin: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Execute Python code in a warm worker for the project
+
+        Returns the same dictionary shape as execute_python_code:
+        output, error and exit_code
+        """
+        slots = self._slots.setdefault(
+            project_id, asyncio.Semaphore(self.max_workers_per_project)
+        )
+        async with slots:
+            try:
+                worker = await self._acquire(project_id, working_dir, python_executable)
+            except Exception as e:
+                return {"output": "", "error": str(e), "exit_code": -1}
+
+            try:
+                result = await asyncio.wait_for(self._roundtrip(worker, code, stdin), timeout)
+            except asyncio.TimeoutError:
+                await self._kill(worker)
+                return {
+                    "output": "",
+                    "error": "Code execution timed out",
+                    "exit_code": -1,
+                }
+            except (asyncio.IncompleteReadError, ConnectionError):
+                # Node code terminated the interpreter (e.g. os._exit)
+                await self._kill(worker)
+                return {
+                    "output": "",
+                    "error": "Worker process exited unexpectedly",
+                    "exit_code": worker.proc.returncode or -1,
+                }
+            except BaseException:
+                # The request was cancelled mid-run: stop the node code with it
+                await self._kill(worker)
+                raise
+
+            self._release(project_id, worker)
+            return result
+
+    async def discard(self, project_id: str) -> None:
+        """Stop all workers of a project, e.g. after the project is deleted"""
+        self._generations[project_id] = self._generations.get(project_id, 0) + 1
+        for worker in self._idle.pop(project_id, []):
+            worker.reaper.cancel()
+            await self._kill(worker)
+
+    async def shutdown(self) -> None:
+        """Stop every idle worker"""
+        for project_id in list(self._idle):
+            await self.discard(project_id)
+
+    async def _acquire(
+        self,
+        project_id: str,
+        working_dir: Optional[str],
+        python_executable: Optional[str],
+    ) -> _Worker:
+        """Take a healthy idle worker or start a new one"""
+        idle = self._idle.get(project_id, [])
+        while idle:
+            worker = idle.pop()
+            worker.reaper.cancel()
+            if worker.proc.returncode is None and not self._expired(worker):
+                return worker
+            await self._kill(worker)
+
+        proc = await asyncio.create_subprocess_exec(
+            python_executable or sys.executable,
+            "-c",
+            _WORKER_SOURCE,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            cwd=working_dir,
+        )
+        return _Worker(proc, self._generations.get(project_id, 0))
+
+    def _release(self, project_id: str, worker: _Worker) -> None:
+        """Return a worker to the idle list, or retire it"""
+        worker.uses += 1
+        if (
+            worker.proc.returncode is not None
+            or self._expired(worker)
+            or worker.generation != self._generations.get(project_id, 0)
+        ):
+            asyncio.ensure_future(self._kill(worker))
+            return
+
+        # Make room under the global idle cap by retiring the longest-idle worker
+        idle_workers = [(w, pid) for pid, workers in self._idle.items() for w in workers]
+        if len(idle_workers) >= self.max_idle_workers:
+            oldest, oldest_project = min(idle_workers, key=lambda item: item[0].idle_since)
+            self._retire_idle(oldest_project, oldest)
+
+        # Retire the worker once it has been idle too long or reaches its max age
+        worker.idle_since = time.monotonic()
+        delay = min(
+            self.idle_timeout_sec,
+            max(0.0, self.max_age_sec - (worker.idle_since - worker.started)),
+        )
+        worker.reaper = asyncio.get_running_loop().call_later(
+            delay, self._retire_idle, project_id, worker
+        )
+        self._idle.setdefault(project_id, []).append(worker)
+
+    def _retire_idle(self, project_id: str, worker: _Worker) -> None:
+        """Take a worker off the idle list and stop it"""
+        worker.reaper.cancel()
+        idle = self._idle.get(project_id, [])
+        if worker in idle:
+            idle.remove(worker)
+            if not idle:
+                del self._idle[project_id]
+        asyncio.ensure_future(self._kill(worker))
+
+    def _expired(self, worker: _Worker) -> bool:
+        return (
+            worker.uses >= self.max_uses
+            or time.monotonic() - worker.started > self.max_age_sec
+        )
+
+    @staticmethod
+    async def _roundtrip(worker: _Worker, code: str, stdin: Optional[str]) -> Dict[str, Any]:
+        """Send one request to a worker and wait for its reply"""
+        code_bytes = code.encode()
+        stdin_bytes = (stdin or "").encode()
+        worker.proc.stdin.write(
+            struct.pack(">II", len(code_bytes), len(stdin_bytes)) + code_bytes + stdin_bytes
+        )
+        await worker.proc.stdin.drain()
+
+        header = await worker.proc.stdout.readexactly(4)
+        reply = await worker.proc.stdout.readexactly(struct.unpack(">I", header)[0])
+        return json.loads(reply)
+
+    @staticmethod
+    async def _kill(worker: _Worker) -> None:
+        if worker.proc.returncode is None:
+            worker.proc.kill()
+        await worker.proc.wait()
+
+
+# Shared pool used by the API routers
+worker_pool = WorkerPool()
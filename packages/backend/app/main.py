@@ -3,7 +3,11 @@ from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import asyncio
 from app.api import health, code, project, components
+from app.api.responses import ORJSONResponse
+from app.core.enhanced_flow_executor import EnhancedFlowExecutor
 from app.core.logging import get_logger
+from app.core.project_structure import normalize_project_structures
+from app.core.worker_pool import worker_pool
 
 logger = get_logger(__name__)
 
@@ -13,15 +17,27 @@ async def lifespan(app: FastAPI):
     """Manage application lifecycle"""
     # Startup
     logger.info("Starting AIM Red Toolkit Backend")
+    # Reads serve structure.json as stored, so bring older files up to date once
+    rewritten = await asyncio.to_thread(normalize_project_structures)
+    if rewritten:
+        logger.info("Normalized %d project structure(s)", rewritten)
+    app.state.flow_executor = EnhancedFlowExecutor(project.PROJECTS_ROOT)
 
     yield
 
     # Shutdown
     logger.info("Shutting down AIM Red Toolkit Backend")
+    await worker_pool.shutdown()
+    app.state.flow_executor.close()
     logger.info("Shutdown complete")
 
 
-app = FastAPI(title="AIM Red Toolkit Backend", version="1.0.0", lifespan=lifespan)
+app = FastAPI(
+    title="AIM Red Toolkit Backend",
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
 
 # CORS middleware configuration
 app.add_middleware(
@@ -59,4 +75,7 @@ app.include_router(components.router, prefix="/api/components")
 if __name__ == "__main__":
     import uvicorn
 
-    uvicorn.run(app, host="0.0.0.0", port=8000, reload=True)
+    # loop="auto" picks uvloop where it is installed (not on Windows)
+    uvicorn.run(
+        app, host="0.0.0.0", port=8000, reload=True, loop="auto", http="httptools"
+    )
@@ -0,0 +1,57 @@
+"""Entry-point resolution for node files run by EnhancedFlowExecutor"""
+
+import pytest
+
+from app.core.enhanced_flow_executor import EnhancedFlowExecutor
+
+
+@pytest.fixture
+def run_node(tmp_path):
+    (tmp_path / "proj").mkdir()
+    executor = EnhancedFlowExecutor(str(tmp_path))
+
+    def run(source, input_data=None):
+        (tmp_path / "proj" / "node.py").write_text(source)
+        return executor._execute_in_process("proj", "n", {"data": {"file": "node.py"}}, input_data)
+
+    return run
+
+
+def test_runscript_wins_over_main_and_earlier_functions(run_node):
+    source = (
+        "def helper(input_data=None):\n    return 'helper'\n"
+        "def main(input_data=None):\n    return 'main'\n"
+        "def RunScript(input_data=None):\n    return 'RunScript'\n"
+    )
+    assert run_node(source) == "RunScript"
+
+
+def test_main_wins_over_earlier_functions(run_node):
+    source = (
+        "def helper(input_data=None):\n    return 'helper'\n"
+        "def main(input_data=None):\n    return 'main'\n"
+    )
+    assert run_node(source) == "main"
+
+
+def test_first_module_level_callable_in_source_order(run_node):
+    source = (
+        "def _private(input_data=None):\n    return 'private'\n"
+        "def first(input_data=None):\n    return 'first'\n"
+        "def second(input_data=None):\n    return 'second'\n"
+    )
+    assert run_node(source) == "first"
+
+
+def test_callables_bound_in_blocks_are_found(run_node):
+    source = (
+        "if True:\n"
+        "    def conditional(input_data=None):\n        return 'conditional'\n"
+    )
+    assert run_node(source) == "conditional"
+
+
+def test_namespace_helpers_are_not_entry_points(run_node):
+    # Path and friends come from the executor, not the node file
+    with pytest.raises(RuntimeError, match="No callable function found"):
+        run_node("value = 1\n")
@@ -0,0 +1,47 @@
+"""Inline vs. reference decisions made by EnhancedFlowExecutor._wrap_output"""
+
+import enum
+
+import pytest
+
+from app.core.enhanced_flow_executor import EnhancedFlowExecutor
+
+
+@pytest.fixture
+def executor(tmp_path):
+    return EnhancedFlowExecutor(str(tmp_path))
+
+
+def _is_reference(value):
+    return isinstance(value, dict) and value.get("type") == "reference"
+
+
+@pytest.mark.parametrize("value", [1, 2.5, "text", True, None, {"a": [1, 2]}])
+def test_json_values_are_inline(executor, value):
+    assert executor._wrap_output("p", "n", value) == value
+
+
+def test_scalar_subclasses_are_inline_as_base_values(executor):
+    class Level(enum.IntEnum):
+        HIGH = 3
+
+    class Ratio(float):
+        pass
+
+    assert type(executor._wrap_output("p", "n", Level.HIGH)) is int
+    assert executor._wrap_output("p", "n", Ratio(0.5)) == 0.5
+
+
+def test_numpy_scalars_are_inline(executor):
+    np = pytest.importorskip("numpy")
+    for value, expected in [(np.float64(2.5), 2.5), (np.float32(0.5), 0.5), (np.int64(7), 7), (np.bool_(True), True)]:
+        output = executor._wrap_output("p", "n", value)
+        assert output == expected
+        assert type(output) is type(expected)
+
+
+def test_arrays_and_unencodable_values_become_references(executor):
+    np = pytest.importorskip("numpy")
+    assert _is_reference(executor._wrap_output("p", "n", np.zeros(3)))
+    assert _is_reference(executor._wrap_output("p", "n", {1, 2}))
+    assert _is_reference(executor._wrap_output("p", "n", 2 ** 70))
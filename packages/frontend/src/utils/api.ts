@@ -246,12 +246,17 @@ export const projectApi = {
             const data = line.slice(6);
             try {
               const event = JSON.parse(data);
-              onEvent(event);
+              // Node results that arrive together are sent as one batch event
+              const events = event.type === 'batch' ? event.events : [event];
               
-              // Stop reading if we get a complete or error event
-              if (event.type === 'complete' || event.type === 'error') {
-                reader.cancel();
-                return;
+              for (const item of events) {
+                onEvent(item);
+                
+                // Stop reading if we get a complete or error event
+                if (item.type === 'complete' || item.type === 'error') {
+                  reader.cancel();
+                  return;
+                }
               }
             } catch (error) {
               console.error('Failed to parse SSE event:', error, data);